@@ -0,0 +1,184 @@
+import json
+import os
+import re
+import unicodedata
+from collections import Counter
+from rapidfuzz import fuzz
+import metrics
+
+# hand checked aliases, normalized spelling -> institution
+ALIASES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'affiliation_aliases.json')
+# merges found by earlier runs, reused so that known spellings need no comparison
+LEARNED_ALIASES_PATH = 'cache/affiliation_aliases.json'
+# "uiuc & google" or "ku leuven; imec" list several institutions, the first one is counted
+SEPARATORS = re.compile(r'\s+&\s+|;|\s+/\s+|\s+\+\s+')
+NON_WORD = re.compile(r'[^\w]+')
+DIGITS = re.compile(r'\d+')
+STOPWORDS = {'of', 'the', 'at', 'in', 'and', 'for', 'de', 'di', 'du', 'la', 'le', 'des', 'der', 'fur', 'a'}
+ABBREVIATIONS = {'univ': 'university', 'uni': 'university', 'u': 'university', 'inst': 'institute', 'tech': 'technology', 'natl': 'national', 'dept': 'department', 'lab': 'laboratory', 'labs': 'laboratories'}
+# tokens shared by too many institutions to say anything about a pair
+GENERIC_TOKENS = {'university', 'institute', 'technology', 'national', 'research', 'college', 'school', 'laboratory', 'laboratories', 'center', 'centre', 'department', 'science', 'sciences', 'computer', 'engineering', 'polytechnic', 'academy', 'inc', 'corporation', 'corp', 'ltd', 'gmbh'}
+# blocks with more spellings than this are too unspecific to compare all their pairs
+MAX_BLOCK_SIZE = 50
+MATCH_THRESHOLD = 92
+
+def primary(affiliation):
+    return SEPARATORS.split(affiliation.strip())[0].strip()
+
+def tokens(affiliation):
+    # accents, case, punctuation, stop words and common abbreviations do not tell institutions apart
+    text = unicodedata.normalize('NFKD', affiliation)
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    words = [ABBREVIATIONS.get(word, word) for word in NON_WORD.sub(' ', text).split()]
+    return [word for word in words if word not in STOPWORDS]
+
+def normalize(affiliation):
+    return ' '.join(tokens(primary(affiliation)))
+
+def acronym(words):
+    return ''.join(word[0] for word in words) if len(words) > 1 else None
+
+def core(words):
+    return [word for word in words if word not in GENERIC_TOKENS]
+
+def blocking_keys(words):
+    # spellings only get compared when they share one of these keys, e.g. "univ illinois urbana
+    # champaign" and "university ilinois urbana champaign" share the acronym key uiuc, and
+    # "torontoo" and "toronto" the token prefix toro
+    keys = {('acronym', words[0] if len(words) == 1 else acronym(words))}
+    for word in core(words):
+        if len(word) > 2:
+            keys.add(('token', word))
+        if len(word) > 4:
+            keys.add(('prefix', word[:4]))
+    keys.update(('number', number) for number in DIGITS.findall(' '.join(words)))
+    return keys
+
+def same_institution(name, other):
+    words, other_words = name.split(' '), other.split(' ')
+    # campus numbers or years, e.g. "paris 6" and "paris 7", are different institutions
+    if DIGITS.findall(name) != DIGITS.findall(other):
+        return False
+    if core(words) and core(words) == core(other_words):
+        generic, other_generic = sorted(set(words) - set(core(words))), sorted(set(other_words) - set(core(other_words)))
+        # "university of toronto" and "toronto university"
+        if generic == other_generic:
+            return True
+        # "google" and "google research", or "stanford" and "stanford university", but not "university of
+        # vienna" and "vienna university of technology" that only share the name of their city
+        return not (generic and other_generic) and len(generic) + len(other_generic) == 1
+    # acronyms are ambiguous, e.g. "ntu", they are only merged by merge_acronyms
+    if len(words) == 1 or len(other_words) == 1:
+        return False
+    return fuzz.ratio(name, other) >= MATCH_THRESHOLD
+
+class UnionFind:
+    def __init__(self):
+        self.parents = {}
+
+    def find(self, item):
+        root = self.parents.setdefault(item, item)
+        while root != self.parents[root]:
+            root = self.parents[root]
+        # compress the path so later finds are short
+        while item != root:
+            self.parents[item], item = root, self.parents[item]
+        return root
+
+    def union(self, item, other):
+        root, other_root = self.find(item), self.find(other)
+        if root != other_root:
+            self.parents[other_root] = root
+        return root != other_root
+
+def merge_acronyms(names, clusters, known):
+    # an acronym is merged with the institution it spells out only if no other institution
+    # among the names has the same acronym, known aliases are already merged with theirs
+    spelled_out = {}
+    for name in names:
+        words = name.split(' ')
+        if len(words) > 1:
+            spelled_out.setdefault(acronym(words), set()).add(name)
+    merged = []
+    for name in names:
+        if ' ' in name or name in known:
+            continue
+        candidates = {clusters.find(other) for other in spelled_out.get(name, ())}
+        if len(candidates) == 1 and clusters.union(candidates.pop(), name):
+            merged.append(name)
+    return merged
+
+def load_aliases(path):
+    if path is None or not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return {normalize(alias): institution for alias, institution in json.load(f).items()}
+
+def save_aliases(path, aliases):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(aliases, f, indent=4, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+def resolve_affiliations(affiliations, learned_path=LEARNED_ALIASES_PATH):
+    # maps every affiliation string to the name of its institution
+    counts = Counter(affiliations)
+    normalized = {affiliation: normalize(affiliation) for affiliation in counts}
+    curated = load_aliases(ALIASES_PATH)
+    learned = load_aliases(learned_path)
+    aliases = {**learned, **curated}
+
+    clusters = UnionFind()
+    # known aliases of one institution start out merged
+    by_institution = {}
+    for name, institution in aliases.items():
+        clusters.union(by_institution.setdefault(institution, name), name)
+
+    with metrics.phase('affiliation_resolution'):
+        blocks = {}
+        for name in set(normalized.values()) | set(aliases):
+            if name:
+                for key in blocking_keys(name.split(' ')):
+                    blocks.setdefault(key, []).append(name)
+
+        pairs = 0
+        for names in blocks.values():
+            if len(names) > MAX_BLOCK_SIZE:
+                continue
+            for i, name in enumerate(names):
+                for other in names[i + 1:]:
+                    if clusters.find(name) == clusters.find(other):
+                        continue
+                    pairs += 1
+                    if same_institution(name, other):
+                        clusters.union(name, other)
+        metrics.increment('affiliation_candidate_pairs', pairs)
+        acronyms = merge_acronyms(sorted(set(normalized.values()) | set(aliases)), clusters, aliases)
+
+    # institutions are named by their alias entry or else by their most common spelling
+    spellings = {}
+    for affiliation, count in counts.items():
+        spellings.setdefault(clusters.find(normalized[affiliation]), Counter())[primary(affiliation)] += count
+    names = {}
+    for name, institution in aliases.items():
+        names.setdefault(clusters.find(name), institution)
+    for root, root_spellings in spellings.items():
+        if root not in names:
+            names[root] = max(root_spellings.items(), key=lambda item: (item[1], len(item[0])))[0]
+
+    institutions = {affiliation: names[clusters.find(name)] if name else affiliation for affiliation, name in normalized.items()}
+    metrics.increment('affiliation_merges', len(counts) - len(set(institutions.values())))
+
+    if learned_path is not None:
+        # merges that rest on an acronym are not learned, they are decided again with the names of the next run
+        guessed = {clusters.find(name) for name in acronyms}
+        learned.update({name: names[clusters.find(name)] for name in normalized.values() if name and name not in curated and clusters.find(name) not in guessed})
+        save_aliases(learned_path, learned)
+    return institutions
+
+def add_institutions(rows, learned_path=LEARNED_ALIASES_PATH):
+    institutions = resolve_affiliations([row['affiliation'] for row in rows], learned_path)
+    for row in rows:
+        row['institution'] = institutions[row['affiliation']]
+    return rows
@@ -0,0 +1,73 @@
+from collections import Counter
+from artifact_table import conference_year
+
+CONTINENTS = {
+    'AF': 'Africa',
+    'AS': 'Asia',
+    'EU': 'Europe',
+    'NA': 'North America',
+    'SA': 'South America',
+    'OC': 'Oceania',
+    'AN': 'Antarctica',
+}
+
+# country name -> continent name, None for countries pycountry_convert does not know
+_continents = {}
+
+def member_table(committees):
+    # one flat row per committee member, further columns like country are added to the rows
+    rows = []
+    for conference, members in committees.items():
+        year = conference_year(conference)
+        for member in members:
+            rows.append({'conference': conference, 'year': year, 'name': member['name'], 'affiliation': member['affiliation']})
+    return rows
+
+def continent_lookup(countries):
+    # every distinct country is converted once per process instead of once per row
+    from pycountry_convert import country_name_to_country_alpha2, country_alpha2_to_continent_code
+    for country in countries:
+        if country in _continents:
+            continue
+        try:
+            _continents[country] = CONTINENTS[country_alpha2_to_continent_code(country_name_to_country_alpha2(country))]
+        except KeyError:
+            print(f"Could not map country {country} to a continent.")
+            _continents[country] = None
+    return {country: _continents[country] for country in countries}
+
+def add_continents(rows):
+    lookup = continent_lookup({row['country'] for row in rows if row.get('country') is not None})
+    for row in rows:
+        row['continent'] = lookup.get(row.get('country'))
+    return rows
+
+def nest(flat):
+    # {(a, b): value} -> {a: {b: value}}, keys keep the order they were first seen in
+    nested = {}
+    for key, value in flat.items():
+        level = nested
+        for part in key[:-1]:
+            level = level.setdefault(part, {})
+        level[key[-1]] = value
+    return nested
+
+def group_keys(rows, keys):
+    # rows missing any of the keys, e.g. members without a matched country, are left out
+    for row in rows:
+        key = tuple(row.get(name) for name in keys)
+        if None not in key:
+            yield key, row
+
+def count_by(rows, *keys):
+    # number of rows per value of the keys, nested one level per key
+    return nest(Counter(key for key, _ in group_keys(rows, keys)))
+
+def ranked(counts, top=None):
+    # (value, count) pairs of a single key count, largest first
+    return sorted(counts.items(), key=lambda item: item[1], reverse=True)[:top]
+
+def conference_order(rows):
+    # conferences of the rows sorted by year and name, with their years
+    conferences = sorted({row['conference'] for row in rows}, key=lambda conference: (conference_year(conference), conference))
+    return conferences, [float(conference_year(conference)) for conference in conferences]
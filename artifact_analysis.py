@@ -0,0 +1,37 @@
+import argparse
+import importlib
+import sys
+
+# subcommand, module whose main() runs it and help text, modules are only imported when their command runs
+COMMANDS = {
+    'scrape-results': ('sys_sec_artifacts_results_scrape', 'Scrape the artifact results of conferences'),
+    'scrape-committee': ('sys_sec_committee_scrape', 'Scrape the artifact evaluation committees of conferences'),
+    'check-urls': ('test_artifact_repositories', 'Check that repository and DOI links of artifacts still exist'),
+    'stats': ('collect_artifact_stats', 'Collect stars, forks, views and downloads of artifacts'),
+    'committee-stats': ('committee_statistics', 'Statistics about committee members, their affiliations and countries'),
+    'report': ('conference_report', 'Badge counts, badge rates and AEC sizes per conference'),
+    'plot': ('eurosys_plot', 'Plot figures for a conference series'),
+    'university-index': ('university_index', 'Build the index of universities used to match affiliations'),
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Analysis of the artifacts and committees of sys/secartifacts.github.io.', epilog='Run a command with --help for its arguments. Commands separated by + run one after the other in one process, e.g. stats + plot --plot_all, and share the conference listing, results and committees scraped by the first command that needs them.')
+    parser.add_argument('command', choices=COMMANDS, metavar='command', help='One of: ' + ', '.join(f'{name} ({help_text})' for name, (_, help_text) in COMMANDS.items()))
+    parser.add_argument('arguments', nargs=argparse.REMAINDER, help='Arguments of the command')
+
+    runs = [[]]
+    for argument in sys.argv[1:] if argv is None else argv:
+        if argument == '+':
+            runs.append([])
+        else:
+            runs[-1].append(argument)
+
+    for run in runs:
+        args = parser.parse_args(run)
+        module, _ = COMMANDS[args.command]
+        # usage and errors of the command name the command, e.g. artifact_analysis.py stats
+        sys.argv[0] = f'{parser.prog} {args.command}'
+        importlib.import_module(module).main(args.arguments)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import http_client
+import metrics
+from canonical_urls import canonical_key, normalize_url
+from collect_artifact_stats import GITHUB_BATCH_SIZE, ZENODO_BATCH_SIZE, figshare_stats_batch, github_stats_batch, zenodo_stats_batch
+from sys_sec_artifacts_results_scrape import iter_ae_results
+from test_artifact_repositories import DEFAULT_CONCURRENCY, HostRateLimiter, check_url_async, is_definitive
+
+# marks the end of a stage's output
+DONE = object()
+# seconds without new artifacts after which partly filled stats batches are fetched anyway
+FLUSH_INTERVAL = 0.5
+# bounds the artifacts waiting between two stages so memory stays flat on large runs
+QUEUE_SIZE = 1000
+
+def stage(errors, target, *args):
+    # exceptions end the stage's output so the stages behind it do not wait forever, and are
+    # kept in errors to be raised by stream_artifact_stats
+    def run():
+        try:
+            target(*args)
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            args[-1].put(DONE)
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+def scrape_stage(conference_regex, prefix, jobs, out):
+    for name, artifacts in iter_ae_results(conference_regex, prefix, jobs):
+        for artifact in artifacts:
+            out.put((name, artifact))
+
+def check_stage(url_keys, concurrency, store, inp, out):
+    if http_client.settings['pool_size'] < concurrency:
+        http_client.configure(pool_size=concurrency)
+    asyncio.run(check_artifacts_async(url_keys, concurrency, store, inp, out))
+
+async def check_artifacts_async(url_keys, concurrency, store, inp, out):
+    loop = asyncio.get_running_loop()
+    limiter = HostRateLimiter()
+    semaphore = asyncio.Semaphore(concurrency)
+    # at most this many artifacts are read ahead of their checks
+    in_flight = asyncio.Semaphore(2 * concurrency)
+    # every repository or record is checked once, no matter how many urls point to it
+    checks = {}
+    tasks = set()
+    # exceptions of the artifact checks, the first one is raised once the running checks are done
+    errors = []
+
+    def finished(task):
+        tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            errors.append(task.exception())
+
+    async def check(key, url):
+        stored = store.get_check(key) if store is not None else None
+        if stored is not None:
+            return stored
+        async with semaphore:
+            report = await check_url_async(url, limiter, executor)
+        # network errors, rate limits and server errors are not stored so that the next run retries them
+        if store is not None and is_definitive(report):
+            store.put_check(key, url, report)
+        return report
+
+    async def check_artifact(name, artifact):
+        try:
+            for url_key in url_keys:
+                if url_key not in artifact:
+                    continue
+                # exception since, some urls are just the doi
+                artifact[url_key] = normalize_url(artifact[url_key])
+                key = canonical_key(artifact[url_key])
+                if key not in checks:
+                    checks[key] = asyncio.ensure_future(check(key, artifact[url_key]))
+                report = await checks[key]
+                artifact[url_key+'_exists'] = report['exists']
+                if not report['exists']:
+                    print(f'{url_key} does not exist for {artifact["title"]} at {name}')
+            await loop.run_in_executor(None, out.put, (name, artifact))
+        finally:
+            in_flight.release()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # no further artifacts are read once a check failed
+        while not errors:
+            await in_flight.acquire()
+            item = await loop.run_in_executor(None, inp.get)
+            if item is DONE:
+                break
+            task = asyncio.create_task(check_artifact(*item))
+            tasks.add(task)
+            task.add_done_callback(finished)
+        await asyncio.gather(*list(tasks), return_exceptions=True)
+    if errors:
+        raise errors[0]
+
+class StatsBatcher:
+    # collects the confirmed urls of each provider into micro batches, an artifact is
+    # passed on once the stats of all its urls arrived
+
+    def __init__(self, url_keys, github_backend, jobs, store, out):
+        self.url_keys = url_keys
+        self.github_backend = github_backend
+        self.jobs = jobs
+        self.store = store
+        self.out = out
+        self.batch_sizes = {'zenodo': ZENODO_BATCH_SIZE, 'figshare': max(jobs, 1), 'github': GITHUB_BATCH_SIZE}
+        # stats of every fetched repository or record, small next to the artifacts
+        self.stats = {}
+        self.pending = {provider: {} for provider in self.batch_sizes}
+        self.waiting = {}
+
+    def add(self, name, artifact):
+        entry = {'name': name, 'artifact': artifact, 'keys': {}, 'missing': set()}
+        for url_key in self.url_keys:
+            if not artifact.get(url_key+'_exists'):
+                continue
+            key = canonical_key(artifact[url_key])
+            if key[0] not in self.batch_sizes: # needed since stats doesn't exist otherwise
+                print(f'No stats for {artifact[url_key]} at {name} titled {artifact["title"]}')
+                continue
+            entry['keys'][url_key] = key
+            if key in self.stats:
+                continue
+            stored = self.store.get_stats(key) if self.store is not None else None
+            if stored is not None:
+                self.stats[key] = stored
+                continue
+            if key not in entry['missing']:
+                entry['missing'].add(key)
+                self.pending[key[0]].setdefault(key, artifact[url_key])
+                self.waiting.setdefault(key, []).append(entry)
+
+        if not entry['missing']:
+            self.finish(entry)
+        for provider, urls in self.pending.items():
+            if len(urls) >= self.batch_sizes[provider]:
+                self.flush(provider)
+
+    def flush(self, provider):
+        urls = self.pending[provider]
+        if not urls:
+            return
+        self.pending[provider] = {}
+        on_stats = None
+        if self.store is not None:
+            # failed fetches are not stored so that the next run retries them
+            on_stats = lambda url, stats: self.store.put_stats(canonical_key(url), url, stats) if stats else None
+        with metrics.phase(f'{provider}_stats'):
+            if provider == 'zenodo':
+                url_stats = zenodo_stats_batch(list(urls.values()), on_stats)
+            elif provider == 'figshare':
+                url_stats = figshare_stats_batch(list(urls.values()), self.jobs, on_stats)
+            else:
+                url_stats = github_stats_batch(list(urls.values()), self.github_backend, on_stats)
+
+        for key, url in urls.items():
+            self.stats[key] = url_stats.get(url)
+            for entry in self.waiting.pop(key, []):
+                entry['missing'].discard(key)
+                if not entry['missing']:
+                    self.finish(entry)
+
+    def flush_all(self):
+        for provider in self.batch_sizes:
+            self.flush(provider)
+
+    def finish(self, entry):
+        artifact = entry['artifact']
+        # earlier url keys win, like in get_all_artifact_stats
+        for key in entry['keys'].values():
+            if self.stats.get(key):
+                artifact['stats'] = {**self.stats[key], **artifact.get('stats', {})}
+        self.out.put((entry['name'], artifact))
+
+def stats_stage(url_keys, github_backend, jobs, store, inp, out):
+    batcher = StatsBatcher(url_keys, github_backend, jobs, store, out)
+    while True:
+        try:
+            item = inp.get(timeout=FLUSH_INTERVAL)
+        except queue.Empty:
+            # the checks are slower than the stats, fetch what is there instead of idling
+            batcher.flush_all()
+            continue
+        if item is DONE:
+            break
+        batcher.add(*item)
+    batcher.flush_all()
+
+def stream_artifact_stats(conference_regex, prefix, url_keys, jobs=1, concurrency=DEFAULT_CONCURRENCY, github_backend='auto', store=None):
+    # scraping, url checks and stats run as stages in their own threads, connected by bounded
+    # queues, and yield (conference, artifact) in the order the artifacts are done
+    scraped = queue.Queue(QUEUE_SIZE)
+    checked = queue.Queue(QUEUE_SIZE)
+    done = queue.Queue(QUEUE_SIZE)
+    errors = []
+    stage(errors, scrape_stage, conference_regex, prefix, jobs, scraped)
+    stage(errors, check_stage, url_keys, concurrency, store, scraped, checked)
+    stage(errors, stats_stage, url_keys, github_backend, jobs, store, checked, done)
+    while True:
+        item = done.get()
+        if item is DONE:
+            break
+        yield item
+    # a failed stage ends the run early, its artifacts must not go missing silently
+    if errors:
+        raise errors[0]
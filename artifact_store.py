@@ -0,0 +1,76 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_TTL_HOURS = 24 * 7
+
+class ArtifactStore:
+    def __init__(self, path, ttl_hours=DEFAULT_TTL_HOURS):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.ttl = ttl_hours * 3600 if ttl_hours is not None else None
+        # the url check and stats stages use the store from their own threads, one
+        # lock serializes every statement and commit on the shared connection
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript('''
+            CREATE TABLE IF NOT EXISTS url_checks (
+                provider TEXT NOT NULL,
+                id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                report TEXT NOT NULL,
+                checked_at REAL NOT NULL,
+                PRIMARY KEY (provider, id)
+            );
+            CREATE TABLE IF NOT EXISTS stats (
+                provider TEXT NOT NULL,
+                id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                stats TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (provider, id)
+            );
+        ''')
+        self.connection.commit()
+
+    def is_fresh(self, timestamp):
+        return self.ttl is None or time.time() - timestamp < self.ttl
+
+    def get_check(self, key):
+        with self.lock:
+            row = self.connection.execute('SELECT report, checked_at FROM url_checks WHERE provider = ? AND id = ?', key).fetchone()
+        if row is None or not self.is_fresh(row[1]):
+            return None
+        return json.loads(row[0])
+
+    def put_check(self, key, url, report):
+        # committed right away so an interrupted run keeps every finished check
+        with self.lock:
+            self.connection.execute('INSERT OR REPLACE INTO url_checks VALUES (?, ?, ?, ?, ?)', (*key, url, json.dumps(report), time.time()))
+            self.connection.commit()
+
+    def get_stats(self, key):
+        with self.lock:
+            row = self.connection.execute('SELECT stats, fetched_at FROM stats WHERE provider = ? AND id = ?', key).fetchone()
+        if row is None or not self.is_fresh(row[1]):
+            return None
+        return json.loads(row[0])
+
+    def put_stats(self, key, url, stats):
+        with self.lock:
+            self.connection.execute('INSERT OR REPLACE INTO stats VALUES (?, ?, ?, ?, ?)', (*key, url, json.dumps(stats), time.time()))
+            self.connection.commit()
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+def add_arguments(parser, default_path=None):
+    parser.add_argument('--store', type=str, default=default_path, help='SQLite file keeping URL checks and stats between runs, reruns only fetch missing or expired entries')
+    parser.add_argument('--ttl', type=float, default=DEFAULT_TTL_HOURS, help='Hours after which stored URL checks and stats are fetched again')
+
+def open_from_args(args):
+    return ArtifactStore(args.store, args.ttl) if args.store else None
@@ -0,0 +1,115 @@
+import re
+import numpy as np
+
+COUNT_COLUMNS = ['github_stars', 'github_forks', 'zenodo_views', 'zenodo_downloads', 'figshare_views', 'figshare_downloads']
+DATE_COLUMNS = ['created_at', 'updated_at', 'pushed_at']
+YEAR = re.compile(r'(\d{4})')
+
+def conference_year(name):
+    match = YEAR.search(name)
+    return int(match.group(1)) if match else -1
+
+def badges_text(badges):
+    if badges is None:
+        return None
+    if isinstance(badges, (list, tuple)):
+        return ','.join(str(badge).strip() for badge in badges)
+    return str(badges)
+
+def text_values(values):
+    # yaml gives numbers and dates for unquoted values like title: 2024, missing values stay null
+    return [None if value is None else str(value) for value in values]
+
+class ArtifactTable:
+    # one row per artifact, counts are float columns with NaN where a stat is missing
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns['conference'])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    @classmethod
+    def from_results(cls, results, url_keys):
+        rows = [(name, artifact) for name, artifacts in results.items() for artifact in artifacts]
+        columns = {
+            'conference': np.array([name for name, _ in rows], dtype=object),
+            'year': np.array([conference_year(name) for name, _ in rows], dtype=np.int32),
+            'title': np.array([artifact.get('title') for _, artifact in rows], dtype=object),
+            'badges': np.array([badges_text(artifact.get('badges')) for _, artifact in rows], dtype=object),
+        }
+        for url_key in url_keys:
+            columns[url_key] = np.array([artifact.get(url_key) for _, artifact in rows], dtype=object)
+            columns[url_key + '_exists'] = np.array([artifact.get(url_key + '_exists') for _, artifact in rows], dtype=object)
+        for column in COUNT_COLUMNS:
+            columns[column] = np.array([artifact.get('stats', {}).get(column, np.nan) for _, artifact in rows], dtype=np.float64)
+        for column in DATE_COLUMNS:
+            columns[column] = np.array([artifact.get('stats', {}).get(column) for _, artifact in rows], dtype=object)
+        return cls(columns)
+
+    def values_by(self, key, *columns):
+        # non missing values of the columns grouped by key, an artifact's values
+        # stay next to each other in column order
+        values = np.stack([self.columns[column] for column in columns], axis=1)
+        keys = np.repeat(self.columns[key], len(columns))
+        values = values.ravel()
+        present = ~np.isnan(values)
+        grouped = {}
+        for group in dict.fromkeys(self.columns[key]):
+            group_values = values[present & (keys == group)]
+            if len(group_values):
+                grouped[group] = group_values.astype(np.int64).tolist()
+        return grouped
+
+    def to_arrow(self):
+        # pyarrow is only needed to store tables and takes long to import
+        import pyarrow as pa
+        arrays = {}
+        for name, values in self.columns.items():
+            if name in COUNT_COLUMNS:
+                missing = np.isnan(values)
+                arrays[name] = pa.array(np.where(missing, 0, values).astype(np.int64), mask=missing)
+            elif name == 'year':
+                arrays[name] = pa.array(values, type=pa.int32())
+            elif name.endswith('_exists'):
+                arrays[name] = pa.array(values.tolist(), type=pa.bool_())
+            else:
+                arrays[name] = pa.array(text_values(values), type=pa.string())
+        return pa.table(arrays)
+
+    @classmethod
+    def from_arrow(cls, table):
+        columns = {}
+        for name in table.column_names:
+            column = table.column(name)
+            if name in COUNT_COLUMNS:
+                # nulls come back as NaN
+                columns[name] = column.to_numpy().astype(np.float64)
+            elif name == 'year':
+                columns[name] = column.to_numpy()
+            else:
+                columns[name] = np.array(column.to_pylist(), dtype=object)
+        return cls(columns)
+
+    def write(self, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = self.to_arrow()
+        if path.endswith('.parquet'):
+            pq.write_table(table, path)
+        else:
+            # arrow ipc file, can be memory mapped without copying
+            with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    @classmethod
+    def read(cls, path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        if path.endswith('.parquet'):
+            return cls.from_arrow(pq.read_table(path, memory_map=True))
+        with pa.memory_map(path, 'r') as source:
+            return cls.from_arrow(pa.ipc.open_file(source).read_all())
@@ -0,0 +1,106 @@
+import random
+
+# size of sysartifacts today, scaled by the benchmarks
+BASE_CONFERENCES = 50
+ARTIFACTS_PER_CONFERENCE = 25
+COMMITTEE_SIZE = 40
+UNIVERSITIES = 2000
+# share of checked urls that do not exist anymore
+MISSING_RATE = 0.05
+
+SERIES = ['eurosys', 'osdi', 'sosp', 'atc', 'fast', 'nsdi', 'asplos', 'sigcomm', 'middleware', 'socc']
+COUNTRIES = ['United States', 'Germany', 'Switzerland', 'United Kingdom', 'China', 'France', 'Canada', 'Japan', 'India', 'Brazil', 'Australia', 'Italy']
+WORDS = ['North', 'South', 'Lake', 'River', 'Hill', 'Valley', 'Coast', 'Stone', 'Oak', 'Pine', 'Bay', 'Field', 'Harbor', 'Bridge', 'Forest', 'Port']
+FIRST_NAMES = ['Alex', 'Maria', 'Wei', 'Anna', 'John', 'Priya', 'Lukas', 'Sofia', 'Chen', 'Omar', 'Elena', 'David', 'Yuki', 'Sara', 'Jan', 'Ines']
+LAST_NAMES = ['Smith', 'Müller', 'Wang', 'Garcia', 'Rossi', 'Kumar', 'Schmidt', 'Tanaka', 'Silva', 'Novak', 'Dubois', 'Kim', 'Costa', 'Ivanov', 'Jensen', 'Ali']
+
+def letters(number):
+    # a, b, ..., z, ba, bb, ... keeps conference names free of extra digits
+    text = ''
+    while True:
+        text = chr(ord('a') + number % 26) + text
+        number //= 26
+        if number == 0:
+            return text
+
+class Corpus:
+    # deterministic synthetic version of the artifact websites and the apis they link to
+
+    def __init__(self, scale=1, seed=0):
+        rng = random.Random(seed)
+        self.universities = []
+        for i in range(UNIVERSITIES):
+            name = f'University of {rng.choice(WORDS)} {rng.choice(WORDS)}{i}'
+            self.universities.append({'name': name, 'country': rng.choice(COUNTRIES), 'domains': [f'u{i}.edu'], 'web_pages': [f'https://u{i}.edu/']})
+
+        self.conferences = {}
+        self.repositories = {}
+        self.zenodo = {}
+        self.figshare = {}
+        self.missing = set()
+        for i in range(int(BASE_CONFERENCES * scale)):
+            name = f'{SERIES[i % len(SERIES)]}{letters(i // len(SERIES))}{2015 + i % 11}'
+            artifacts = [self.artifact(rng, name, j) for j in range(ARTIFACTS_PER_CONFERENCE)]
+            committee = [self.member(rng) for _ in range(COMMITTEE_SIZE)]
+            self.conferences[name] = {'artifacts': artifacts, 'committee': committee}
+
+    def artifact(self, rng, conference, index):
+        artifact = {'title': f'Artifact {index} of {conference}', 'badges': rng.choice(['available', 'available,functional', 'available,functional,reproduced'])}
+        repo = f'org{rng.randrange(10**6)}/{conference}-{index}'
+        self.repositories[repo.lower()] = {'stars': rng.randrange(500), 'forks': rng.randrange(100), 'name': repo}
+        artifact['repository_url'] = f'https://github.com/{repo}'
+        kind = rng.random()
+        if kind < 0.6:
+            record = str(rng.randrange(10**6, 10**7))
+            self.zenodo[record] = {'views': rng.randrange(2000), 'downloads': rng.randrange(500)}
+            artifact['artifact_url'] = f'https://doi.org/10.5281/zenodo.{record}' if kind < 0.45 else f'https://zenodo.org/records/{record}'
+        elif kind < 0.75:
+            article = str(rng.randrange(10**7, 10**8))
+            self.figshare[article] = {'views': rng.randrange(2000), 'downloads': rng.randrange(500)}
+            artifact['artifact_url'] = f'https://doi.org/10.6084/m9.figshare.{article}.v1'
+        else:
+            # the repository doubles as the artifact
+            artifact['artifact_url'] = artifact['repository_url']
+        for url_key in ['repository_url', 'artifact_url']:
+            if rng.random() < MISSING_RATE:
+                self.missing.add(artifact[url_key])
+        return artifact
+
+    def member(self, rng):
+        name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+        affiliation = rng.choice(self.universities)['name']
+        noise = rng.random()
+        if noise < 0.2:
+            # misspelled affiliations go through fuzzy matching
+            position = rng.randrange(len(affiliation))
+            affiliation = affiliation[:position] + affiliation[position + 1:]
+        elif noise < 0.25:
+            affiliation = f'Institute {rng.randrange(10**4)}'
+        return {'name': name, 'affiliation': affiliation}
+
+    def results_md(self, conference):
+        lines = ['---', 'title: Results', 'artifacts:']
+        for artifact in self.conferences[conference]['artifacts']:
+            lines.append(f'  - title: "{artifact["title"]}"')
+            lines.append(f'    badges: "{artifact["badges"]}"')
+            lines.append(f'    repository_url: {artifact["repository_url"]}')
+            lines.append(f'    artifact_url: {artifact["artifact_url"]}')
+        lines.append('---')
+        return '\n'.join(lines) + '\n'
+
+    def committee_md(self, conference):
+        lines = ['---', 'title: Committee', '---', '', '## Artifact Evaluation Committee', '']
+        for i, member in enumerate(self.conferences[conference]['committee']):
+            # both list formats of the real committee pages
+            if i % 2:
+                lines.append(f'- {member["name"]} ({member["affiliation"]})')
+            else:
+                lines.append(f'- {member["name"]}, {member["affiliation"]}')
+        return '\n'.join(lines) + '\n'
+
+    def size(self):
+        return {
+            'conferences': len(self.conferences),
+            'artifacts': sum(len(conference['artifacts']) for conference in self.conferences.values()),
+            'committee_members': sum(len(conference['committee']) for conference in self.conferences.values()),
+        }
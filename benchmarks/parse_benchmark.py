@@ -0,0 +1,108 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+import yaml
+import sys_sec_scrape
+from corpus import Corpus
+from parsing import YAML_LOADER, parse_committee, parse_front_matter
+from sys_sec_committee_scrape import COMMITTEE_FILES
+
+PREFIXES = ['sys', 'sec']
+
+def synthetic_documents(scale, seed):
+    # sec gets its own corpus so both websites are parsed like in a full run
+    results, committees = [], []
+    for offset, prefix in enumerate(PREFIXES):
+        corpus = Corpus(scale, seed + offset)
+        for conference in corpus.conferences:
+            results.append(corpus.results_md(conference))
+            committees.append(corpus.committee_md(conference))
+    return results, committees
+
+def website_documents(source):
+    # results.md and committee pages of every conference of both websites
+    results, committees = [], []
+    for prefix in PREFIXES:
+        sys_sec_scrape.use_source(prefix, source)
+        files = sys_sec_scrape.sources[prefix]
+        for conference in files.list_conferences():
+            names = files.list_files(conference['name'])
+            if 'results.md' in names:
+                results.append(files.read(conference['name'] + '/results.md'))
+            committee_file = next((name for name in COMMITTEE_FILES if name in names), None)
+            if committee_file is not None:
+                committees.append(files.read(conference['name'] + '/' + committee_file))
+    return results, committees
+
+def split_safe_load(content):
+    # how results.md was parsed before parsing.py, kept as a reference
+    return yaml.safe_load(content.split('---')[1])
+
+def measure(stage, parse, documents, repeat):
+    size = sum(len(document.encode('utf-8')) for document in documents)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for document in documents:
+            try:
+                parse(document)
+            except yaml.YAMLError:
+                pass
+        times.append(time.perf_counter() - start)
+    # the fastest run is the least disturbed by the rest of the machine
+    seconds = min(times)
+    return {
+        'stage': stage,
+        'files': len(documents),
+        'megabytes': size / 10**6,
+        'seconds': seconds,
+        'files_per_second': len(documents) / seconds if seconds else None,
+        'megabytes_per_second': size / 10**6 / seconds if seconds else None,
+    }
+
+def print_results(results, baseline):
+    baseline = {result['stage']: result for result in baseline}
+    print(f'{"stage":<40}{"files":>8}{"MB":>8}{"seconds":>10}{"files/s":>11}{"MB/s":>8}{"vs baseline":>13}')
+    for result in results:
+        previous = baseline.get(result['stage'])
+        change = f'{previous["seconds"] / result["seconds"]:.2f}x' if previous and result['seconds'] else ''
+        print(f'{result["stage"]:<40}{result["files"]:>8}{result["megabytes"]:>8.2f}{result["seconds"]:>10.3f}{result["files_per_second"] or 0:>11.1f}{result["megabytes_per_second"] or 0:>8.2f}{change:>13}')
+
+def main():
+    parser = argparse.ArgumentParser(description='Parsing throughput of results.md front matter and committee pages over the sys and sec websites.')
+    parser.add_argument('--source', type=str, default='synthetic', help="'synthetic' for the generated corpus, 'tarball' to download both website archives, or the path of a local checkout or tarball used for both prefixes")
+    parser.add_argument('--scale', type=float, default=1, help='Size of the synthetic corpus as a multiple of the current sysartifacts corpus')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic corpus')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of runs per stage, the fastest one is reported')
+    parser.add_argument('--output', type=str, default=None, help='Write the results as JSON, e.g. to compare runs with --baseline')
+    parser.add_argument('--baseline', type=str, default=None, help='JSON results of an earlier run to compare against')
+    args = parser.parse_args()
+
+    if args.source == 'synthetic':
+        results_files, committee_files = synthetic_documents(args.scale, args.seed)
+    else:
+        results_files, committee_files = website_documents(args.source)
+
+    results = [
+        measure('results.md split + yaml.safe_load', split_safe_load, results_files, args.repeat),
+        measure(f'results.md front matter ({YAML_LOADER.__name__})', parse_front_matter, results_files, args.repeat),
+        measure('committee pages', parse_committee, committee_files, args.repeat),
+    ]
+
+    baseline = []
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import traceback
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+import requests
+import http_client
+import stand_in
+import test_artifact_repositories
+from corpus import Corpus
+from collect_artifact_stats import get_all_artifact_stats
+from committee_statistics import classify_aec_by_country
+from sys_sec_artifacts_results_scrape import get_ae_results
+from sys_sec_committee_scrape import get_committees
+from test_artifact_repositories import check_artifact_exists
+
+URL_KEYS = ['repository_url', 'artifact_url']
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+def stand_in_counts(base_url):
+    return requests.get(f'{base_url}/_stats').json()
+
+def measure(name, scale, base_url, verbose, function, items):
+    requests.get(f'{base_url}/_reset')
+    output = io.StringIO()
+    with contextlib.nullcontext() if verbose else contextlib.redirect_stdout(output):
+        start = time.perf_counter()
+        value = function()
+        seconds = time.perf_counter() - start
+    counts = stand_in_counts(base_url)
+    result = {
+        'stage': name,
+        'scale': scale,
+        'seconds': seconds,
+        'items': items(value),
+        'requests': sum(sum(statuses.values()) for statuses in counts.values()),
+        'rate_limited': sum(statuses.get('429', 0) for statuses in counts.values()),
+    }
+    result['items_per_second'] = result['items'] / seconds if seconds else None
+    return value, result
+
+def run_scale(args, scale, queue):
+    process, base_url = stand_in.start(scale, args.seed, args.latency, args.rate_limit, args.retry_after)
+    try:
+        # every request of the scripts goes to the stand-in, caches start empty
+        os.chdir(tempfile.mkdtemp(prefix='artifact-benchmark-'))
+        http_client.configure(url_rewrite=base_url, retries=args.retries, backoff=args.backoff, pool_size=max(args.concurrency, http_client.DEFAULT_POOL_SIZE))
+        if not args.respect_rate_limits:
+            test_artifact_repositories.HOST_RATES = {}
+            test_artifact_repositories.DEFAULT_HOST_RATE = (args.host_rate, args.host_rate)
+
+        size = Corpus(scale, args.seed).size()
+        results = []
+        ae_results, result = measure('get_ae_results', scale, base_url, args.verbose, lambda: get_ae_results('.', 'sys', args.jobs), lambda value: sum(map(len, value.values())))
+        results.append(result)
+        committees, result = measure('get_committees', scale, base_url, args.verbose, lambda: get_committees('.', 'sys', args.jobs), lambda value: sum(map(len, value.values())))
+        results.append(result)
+
+        report = {}
+        _, result = measure('check_artifact_exists', scale, base_url, args.verbose, lambda: check_artifact_exists(ae_results, URL_KEYS, args.concurrency, report), lambda value: len(report))
+        latencies = [url_report['latency'] for url_report in report.values()]
+        result['p50_latency'] = percentile(latencies, 0.5)
+        result['p95_latency'] = percentile(latencies, 0.95)
+        results.append(result)
+
+        _, result = measure('get_all_artifact_stats', scale, base_url, args.verbose, lambda: get_all_artifact_stats(ae_results, URL_KEYS, args.github_backend, args.jobs), lambda value: sum('stats' in artifact for artifacts in value.values() for artifact in artifacts))
+        results.append(result)
+
+        # the first run builds the university index, the second one loads it from disk
+        for name in ['classify_aec_by_country', 'classify_aec_by_country (warm)']:
+            _, result = measure(name, scale, base_url, args.verbose, lambda: classify_aec_by_country(committees), lambda value: size['committee_members'])
+            results.append(result)
+
+        for result in results:
+            result['corpus'] = size
+        queue.put(results)
+    except Exception:
+        queue.put(traceback.format_exc())
+    finally:
+        process.terminate()
+
+def print_results(results, baseline):
+    baseline = {(result['stage'], result['scale']): result for result in baseline}
+    print(f'{"stage":<34}{"scale":>6}{"seconds":>10}{"items":>9}{"items/s":>11}{"requests":>10}{"429s":>7}{"p95 latency":>13}{"vs baseline":>13}')
+    for result in results:
+        p95 = f'{result["p95_latency"] * 1000:.1f}ms' if result.get('p95_latency') is not None else ''
+        previous = baseline.get((result['stage'], result['scale']))
+        change = f'{previous["seconds"] / result["seconds"]:.2f}x' if previous and result['seconds'] else ''
+        print(f'{result["stage"]:<34}{result["scale"]:>6}{result["seconds"]:>10.2f}{result["items"]:>9}{result["items_per_second"] or 0:>11.1f}{result["requests"]:>10}{result["rate_limited"]:>7}{p95:>13}{change:>13}')
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmarks of the scraping, checking, stats and matching stages against a local stand-in for GitHub, Zenodo, Figshare and doi.org.')
+    parser.add_argument('--scales', type=float, nargs='+', default=[10, 100], help='Corpus sizes as multiples of the current sysartifacts corpus')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic corpus and of the injected rate limits')
+    parser.add_argument('--latency', type=float, default=0.005, help='Seconds the stand-in waits before answering each request')
+    parser.add_argument('--rate_limit', type=float, default=0.01, help='Share of requests answered with 429')
+    parser.add_argument('--retry_after', type=int, default=0, help='Retry-After in seconds sent with injected 429s')
+    parser.add_argument('--jobs', type=int, default=8, help='Number of concurrent downloads of conference files and Figshare stats')
+    parser.add_argument('--concurrency', type=int, default=100, help='Number of URLs checked concurrently')
+    parser.add_argument('--github_backend', type=str, choices=['auto', 'graphql', 'rest'], default='graphql', help='How GitHub stats are fetched')
+    parser.add_argument('--retries', type=int, default=3, help='Number of retries for failed or rate limited requests')
+    parser.add_argument('--backoff', type=float, default=0.0, help='Exponential backoff factor in seconds between retries')
+    parser.add_argument('--respect_rate_limits', action='store_true', help='Keep the per host request rates of the URL checker instead of --host_rate')
+    parser.add_argument('--host_rate', type=float, default=10000, help='Requests per second allowed per host by the URL checker')
+    parser.add_argument('--output', type=str, default=None, help='Write the results as JSON, e.g. to compare runs with --baseline')
+    parser.add_argument('--baseline', type=str, default=None, help='JSON results of an earlier run to compare against')
+    parser.add_argument('--verbose', action='store_true', help='Show the output of the measured functions')
+    args = parser.parse_args()
+
+    results = []
+    for scale in args.scales:
+        # a fresh process per scale, module level caches of the scripts start empty
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=run_scale, args=(args, scale, queue))
+        process.start()
+        scale_results = queue.get()
+        process.join()
+        if isinstance(scale_results, str):
+            print(f'Benchmark at scale {scale} failed:\n{scale_results}')
+            sys.exit(1)
+        results.extend(scale_results)
+
+    baseline = []
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+
+if __name__ == "__main__":
+    main()
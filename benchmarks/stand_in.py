@@ -0,0 +1,225 @@
+import hashlib
+import json
+import multiprocessing
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from corpus import Corpus
+
+RAW_CONFERENCE_FILE = re.compile(r'^/[^/]+/[^/]+/master/_conferences/([^/]+)/([^/]+)$')
+GITHUB_REPO = re.compile(r'^/repos/([^/]+)/([^/]+)$')
+ZENODO_DOI = re.compile(r'^/10\.5281/zenodo\.(\d+)$')
+FIGSHARE_DOI = re.compile(r'^/10\.6084/m9\.figshare\.(\d+)\.v\d+$')
+ZENODO_RECORD = re.compile(r'^/records/(\d+)$')
+ZENODO_API_RECORD = re.compile(r'^/api/records/(\d+)$')
+FIGSHARE_STATS = re.compile(r'^/total/(views|downloads)/article/(\d+)$')
+FIGSHARE_ARTICLE = re.compile(r'^/v2/articles/(\d+)$')
+UNIVERSITY_LIST = '/Hipo/university-domains-list/master/world_universities_and_domains.json'
+
+class StandIn:
+    # answers like github, zenodo, figshare and doi.org for the urls of a synthetic corpus,
+    # the original host is the first path segment as written by http_client.rewrite_url
+
+    def __init__(self, corpus, latency=0.0, rate_limit=0.0, retry_after=0, seed=0):
+        self.corpus = corpus
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {}
+
+    def count(self, host, status):
+        with self.lock:
+            host_counts = self.counts.setdefault(host, {})
+            host_counts[status] = host_counts.get(status, 0) + 1
+
+    def rate_limited(self):
+        with self.lock:
+            return self.random.random() < self.rate_limit
+
+    def file(self, conference, filename):
+        if conference not in self.corpus.conferences:
+            return None
+        if filename == 'results.md':
+            return self.corpus.results_md(conference)
+        if filename == 'committee.md':
+            return self.corpus.committee_md(conference)
+        return None
+
+    def tree(self):
+        tree = []
+        for conference in self.corpus.conferences:
+            tree.append({'path': conference, 'type': 'tree', 'sha': hashlib.sha1(conference.encode()).hexdigest()})
+            for filename in ['results.md', 'committee.md']:
+                path = f'{conference}/{filename}'
+                tree.append({'path': path, 'type': 'blob', 'sha': hashlib.sha1(path.encode()).hexdigest()})
+        return {'sha': hashlib.sha1(json.dumps(tree).encode()).hexdigest(), 'tree': tree, 'truncated': False}
+
+    def exists(self, url):
+        return url not in self.corpus.missing
+
+    def repository(self, repo):
+        record = self.corpus.repositories.get(repo.lower())
+        if record is None:
+            return None
+        return {
+            'full_name': record['name'],
+            'forks_count': record['forks'],
+            'stargazers_count': record['stars'],
+            'created_at': '2020-01-01T00:00:00Z',
+            'updated_at': '2024-01-01T00:00:00Z',
+            'pushed_at': '2023-06-01T00:00:00Z',
+        }
+
+    def zenodo_record(self, record_id):
+        record = self.corpus.zenodo.get(record_id)
+        if record is None:
+            return None
+        return {'id': int(record_id), 'stats': {'unique_views': record['views'], 'unique_downloads': record['downloads']}, 'created': '2021-01-01T00:00:00', 'updated': '2022-01-01T00:00:00'}
+
+    def graphql(self, body):
+        data = {'rateLimit': {'cost': 1, 'remaining': 4999, 'limit': 5000}}
+        variables = body.get('variables', {})
+        for key, owner in variables.items():
+            if key.startswith('o'):
+                i = key[1:]
+                record = self.repository(f'{owner}/{variables["n" + i]}')
+                data[f'r{i}'] = None if record is None else {
+                    'nameWithOwner': record['full_name'],
+                    'forkCount': record['forks_count'],
+                    'stargazerCount': record['stargazers_count'],
+                    'createdAt': record['created_at'],
+                    'updatedAt': record['updated_at'],
+                    'pushedAt': record['pushed_at'],
+                }
+        return {'data': data}
+
+    def respond(self, method, host, path, query, body):
+        # returns status, headers and body
+        if host == 'api.github.com':
+            if path == '/graphql':
+                return 200, {}, self.graphql(body)
+            if '/contents/_conferences' in path:
+                return 200, {}, [{'name': name, 'type': 'dir'} for name in self.corpus.conferences]
+            if '/git/trees/' in path:
+                return 200, {}, self.tree()
+            match = GITHUB_REPO.match(path)
+            if match:
+                record = self.repository(f'{match.group(1)}/{match.group(2)}')
+                headers = {'X-RateLimit-Remaining': '4999', 'X-RateLimit-Limit': '5000'}
+                return (200, headers, record) if record else (404, headers, {'message': 'Not Found'})
+        elif host == 'raw.githubusercontent.com':
+            if path == UNIVERSITY_LIST:
+                return 200, {'ETag': '"universities"'}, self.corpus.universities
+            match = RAW_CONFERENCE_FILE.match(path)
+            content = self.file(*match.groups()) if match else None
+            if content is not None:
+                return 200, {}, content
+        elif host == 'github.com':
+            url = f'https://github.com{path}'
+            return (200, {}, '') if self.exists(url) else (404, {}, '')
+        elif host == 'doi.org':
+            url = f'https://doi.org{path}'
+            if self.exists(url):
+                match = ZENODO_DOI.match(path)
+                if match:
+                    return 302, {'Location': f'https://zenodo.org/records/{match.group(1)}'}, ''
+                match = FIGSHARE_DOI.match(path)
+                if match:
+                    return 302, {'Location': f'https://figshare.com/articles/dataset/artifact/{match.group(1)}/1'}, ''
+        elif host == 'zenodo.org':
+            if path == '/api/records':
+                ids = re.findall(r'\d+', query.get('q', [''])[0])
+                hits = [record for record in map(self.zenodo_record, ids) if record is not None]
+                return 200, {}, {'hits': {'hits': hits, 'total': len(hits)}}
+            match = ZENODO_API_RECORD.match(path)
+            if match and self.zenodo_record(match.group(1)):
+                return 200, {}, self.zenodo_record(match.group(1))
+            match = ZENODO_RECORD.match(path)
+            if match and self.exists(f'https://zenodo.org{path}'):
+                return 200, {}, ''
+        elif host == 'figshare.com':
+            return 200, {}, ''
+        elif host == 'stats.figshare.com':
+            match = FIGSHARE_STATS.match(path)
+            if match and match.group(2) in self.corpus.figshare:
+                return 200, {}, {'totals': self.corpus.figshare[match.group(2)][match.group(1)]}
+        elif host == 'api.figshare.com':
+            match = FIGSHARE_ARTICLE.match(path)
+            if match and match.group(1) in self.corpus.figshare:
+                return 200, {}, {'id': int(match.group(1)), 'created_date': '2021-01-01T00:00:00Z', 'modified_date': '2022-01-01T00:00:00Z'}
+        return 404, {}, ''
+
+    def handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def handle_request(self, method):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length)) if length else {}
+                parts = urlsplit(self.path)
+                host, _, path = parts.path.lstrip('/').partition('/')
+                path = '/' + path
+
+                if host == '_stats':
+                    with stand_in.lock:
+                        status, headers, content = 200, {}, stand_in.counts
+                elif host == '_reset':
+                    with stand_in.lock:
+                        stand_in.counts = {}
+                    status, headers, content = 200, {}, ''
+                else:
+                    if stand_in.latency:
+                        time.sleep(stand_in.latency)
+                    if stand_in.rate_limited():
+                        status, headers, content = 429, {'Retry-After': str(stand_in.retry_after)}, ''
+                    else:
+                        status, headers, content = stand_in.respond(method, host, path, parse_qs(parts.query), body)
+                    stand_in.count(host, status)
+
+                if not isinstance(content, str):
+                    content = json.dumps(content)
+                    headers['Content-Type'] = 'application/json'
+                data = content.encode('utf-8')
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                if method != 'HEAD':
+                    self.wfile.write(data)
+
+            def do_GET(self):
+                self.handle_request('GET')
+
+            def do_HEAD(self):
+                self.handle_request('HEAD')
+
+            def do_POST(self):
+                self.handle_request('POST')
+
+        return Handler
+
+def serve(scale, seed, latency, rate_limit, retry_after, ready):
+    stand_in = StandIn(Corpus(scale, seed), latency, rate_limit, retry_after, seed)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), stand_in.handler())
+    server.daemon_threads = True
+    server.request_queue_size = 1024
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+def start(scale=1, seed=0, latency=0.0, rate_limit=0.0, retry_after=0):
+    # runs in its own process so the server does not compete with the measured code for the GIL
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(scale, seed, latency, rate_limit, retry_after, ready), daemon=True)
+    process.start()
+    return process, f'http://127.0.0.1:{ready.get(timeout=120)}'
@@ -0,0 +1,65 @@
+import re
+from urllib.parse import urlsplit, urlunsplit
+
+ZENODO_RECORD = re.compile(r'(?:zenodo\.|/records?/)(\d+)')
+FIGSHARE_DOI = re.compile(r'figshare\.(\d+)(?:\.v\d+)?')
+FIGSHARE_ARTICLE = re.compile(r'figshare\.com/articles/(?:[^/]+/)*?(\d+)(?:/\d+)?/?$')
+DOI = re.compile(r'^(?:https?://(?:dx\.)?doi\.org/|doi:)?(10\.\d{4,}/\S+)$', re.IGNORECASE)
+
+def normalize_url(url):
+    url = url.strip()
+    # some urls are just the doi
+    if url.startswith('10.'):
+        return 'https://doi.org/' + url
+    if url.lower().startswith('doi:'):
+        return 'https://doi.org/' + url[len('doi:'):].strip()
+    return url
+
+def github_repo(url):
+    if 'github.com/' not in url:
+        return None
+    path = url.split('github.com/')[1].split('#')[0].split('?')[0]
+    # owner and name identify the repository, anything after them points to
+    # trees, blobs or packages within it
+    parts = [part for part in path.split('/') if part]
+    if len(parts) < 2:
+        return None
+    owner, name = parts[0], parts[1]
+    if name.endswith('.git'):
+        name = name[:-len('.git')]
+    return f'{owner}/{name}'
+
+def zenodo_record(url):
+    # formats zenodo.org/records/123456, zenodo.org/record/123456 and 10.5281/zenodo.13827000
+    match = ZENODO_RECORD.search(url)
+    return match.group(1) if match else None
+
+def figshare_article(url):
+    # formats 10.6084/m9.figshare.12345678.v1 and figshare.com/articles/<type>/<title>/12345678/1
+    match = FIGSHARE_DOI.search(url) or FIGSHARE_ARTICLE.search(url)
+    return match.group(1) if match else None
+
+def canonical_key(url):
+    url = normalize_url(url)
+    if 'zenodo' in url and zenodo_record(url):
+        return ('zenodo', zenodo_record(url))
+    if 'figshare' in url and figshare_article(url):
+        return ('figshare', figshare_article(url))
+    if github_repo(url):
+        # repository names on github are case insensitive
+        return ('github', github_repo(url).lower())
+
+    doi = DOI.match(url)
+    if doi:
+        return ('doi', doi.group(1).lower())
+
+    parts = urlsplit(url)
+    path = parts.path.rstrip('/')
+    return ('url', urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, '')))
+
+def group_by_key(urls):
+    # maps every canonical key to the first url seen for it
+    representatives = {}
+    for url in urls:
+        representatives.setdefault(canonical_key(url), url)
+    return representatives
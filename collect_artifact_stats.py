@@ -1,71 +1,140 @@
 import argparse
-import requests
-from sys_sec_artifacts_results_scrape import get_ae_results
-from test_artifact_repositories import check_artifact_exists
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import artifact_store
+import http_client
+import metrics
+import sys_sec_scrape
+from canonical_urls import canonical_key, figshare_article, github_repo, group_by_key, zenodo_record
+from test_artifact_repositories import DEFAULT_CONCURRENCY
+
+ZENODO_SEARCH_URL = 'https://zenodo.org/api/records'
+# largest page size zenodo allows for unauthenticated searches
+ZENODO_BATCH_SIZE = 25
+FIGSHARE_ENDPOINTS = {
+    'views': 'https://stats.figshare.com/total/views/article/{}',
+    'downloads': 'https://stats.figshare.com/total/downloads/article/{}',
+    'article': 'https://api.figshare.com/v2/articles/{}',
+}
+
+def zenodo_stats_from_record(record):
+    return {'zenodo_views': record['stats']['unique_views'],'zenodo_downloads': record['stats']['unique_downloads'], 'updated_at': record['updated'], 'created_at': record['created']}
 
 def zenodo_stats(url):
-    if '/records/' in url:
-        # url format zenodo.org/record/123456
-        rec = url.split('/records/')[-1]
-    elif 'zenodo.' in url:
-        # format 10.5281/zenodo.13827000
-        rec = url.split('zenodo.')[-1]
-    else:
+    rec = zenodo_record(url)
+    if rec is None:
         print(f'Could not work with zenodo url {url}')
-    response = requests.get(f'https://zenodo.org/api/records/{rec}')
+        return
+    response = http_client.get(f'https://zenodo.org/api/records/{rec}')
     if response.status_code == 200:
-        record = response.json()
-        return {'zenodo_views': record['stats']['unique_views'],'zenodo_downloads': record['stats']['unique_downloads'], 'updated_at': record['updated'], 'created_at': record['created']}
+        return zenodo_stats_from_record(response.json())
     else:
         print(f'Could not collect stats for {url}')
         return
 
+def zenodo_stats_batch(urls, on_stats=None):
+    rec_urls = {}
+    for url in urls:
+        rec = zenodo_record(url)
+        if rec is not None:
+            rec_urls.setdefault(rec, []).append(url)
+    unique_recs = list(rec_urls.keys())
+
+    stats = {}
+    def done(url, url_stats):
+        stats[url] = url_stats
+        if on_stats is not None:
+            on_stats(url, url_stats)
+
+    # one search request returns the records of a whole page of ids
+    for i in range(0, len(unique_recs), ZENODO_BATCH_SIZE):
+        batch = unique_recs[i:i + ZENODO_BATCH_SIZE]
+        response = http_client.get(ZENODO_SEARCH_URL, params={'q': f'recid:({" OR ".join(batch)})', 'size': len(batch), 'allversions': 'true'})
+        if response.status_code == 200:
+            for hit in response.json()['hits']['hits']:
+                for url in rec_urls.get(str(hit['id']), []):
+                    done(url, zenodo_stats_from_record(hit))
+        else:
+            print(f'Zenodo search for {len(batch)} records failed with {response.status_code}')
+
+    for url in urls:
+        if url not in stats:
+            # concept ids and failed pages fall back to the single record endpoint
+            done(url, zenodo_stats(url))
+    return stats
+
+def figshare_json(url):
+    response = http_client.get(url)
+    return response.json() if response.status_code == 200 else None
+
+def figshare_stats_from_records(views, downloads, article):
+    # None if every endpoint failed, like the other providers
+    if views is None and downloads is None and article is None:
+        return None
+    return {
+        'figshare_views': views['totals'] if views else -1,
+        'figshare_downloads': downloads['totals'] if downloads else -1,
+        'updated_at': article['modified_date'] if article else 'NA',
+        'created_at': article['created_date'] if article else 'NA',
+    }
+
 def figshare_stats(url):
-    if url.endswith(('.v1', '.v2', '.v3', '.v4', '.v5', '.v6', '.v7', '.v8', '.v9')):
-        url = url[:-3]
+    article_id = figshare_article(url)
+    if article_id is None:
+        print(f'Could not work with figshare url {url}')
+        return
+    records = {key: figshare_json(endpoint.format(article_id)) for key, endpoint in FIGSHARE_ENDPOINTS.items()}
+    return figshare_stats_from_records(records['views'], records['downloads'], records['article'])
 
-    article_id = url.split('figshare.')[-1]
-    # views
-    response = requests.get('https://stats.figshare.com/total/views/article/'+article_id)
-    if response.status_code == 200:
-        record = response.json()
-        views = record['totals']
-    else:
-        views = -1
-    # downloads
-    response = requests.get('https://stats.figshare.com/total/downloads/article/'+article_id)
-    if response.status_code == 200:
-        record = response.json()
-        downloads = record['totals']
-    else:
-        downloads = -1
+def figshare_stats_batch(urls, jobs=1, on_stats=None):
+    articles = {url: figshare_article(url) for url in urls}
 
-    response = requests.get(f'https://api.figshare.com/v2/articles/{article_id}')
-    if response.status_code == 200:
-        record = response.json()
-        updated = record['modified_date']
-        created = record['created_date']
-    else:
-        updated = 'NA'
+    stats = {}
+    # views, downloads and article metadata of all articles are fetched concurrently
+    with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+        futures = {}
+        for article_id in dict.fromkeys(articles.values()):
+            if article_id is not None:
+                for key, endpoint in FIGSHARE_ENDPOINTS.items():
+                    futures[(article_id, key)] = executor.submit(figshare_json, endpoint.format(article_id))
 
-    return {'figshare_views':views, 'figshare_downloads': downloads, 'updated_at': updated, 'created_at': created}
+        for url, article_id in articles.items():
+            if article_id is None:
+                print(f'Could not work with figshare url {url}')
+                stats[url] = None
+                continue
+            records = {key: futures[(article_id, key)].result() for key in FIGSHARE_ENDPOINTS}
+            stats[url] = figshare_stats_from_records(records['views'], records['downloads'], records['article'])
+            # stats with -1 or NA for a failed endpoint are returned but not passed to on_stats,
+            # so a store fetches them again next run
+            if on_stats is not None and all(record is not None for record in records.values()):
+                on_stats(url, stats[url])
+    return stats
+
+GITHUB_GRAPHQL_URL = 'https://api.github.com/graphql'
+# GraphQL allows up to 100 repositories in a single query
+GITHUB_BATCH_SIZE = 100
+
+# rate limit budget consumed by this run
+github_budget = {'rest_requests': 0, 'rest_remaining': None, 'rest_limit': None, 'graphql_queries': 0, 'graphql_cost': 0, 'graphql_remaining': None, 'graphql_limit': None}
+
+def github_headers():
+    token = os.environ.get('GITHUB_TOKEN')
+    return {'Authorization': f'bearer {token}'} if token else {}
 
 def github_stats(url):
-    repo = url.split('github.com/')[1]
-    if '/tree/' in repo:
-        # remove any specific tree entities of a repository to get the main repo
-        repo = repo.split('/tree/')[0]
-    if '/blob/' in repo:
-        # remove any specific pointers to files in a repository to get the main repo
-        repo = repo.split('/blob/')[0]
-    if '/pkgs/' in repo:
-        # remove any specific pointers to packages in a repository to get the main repo
-        repo = repo.split('/pkgs/')[0]
-    if repo.endswith('/'):
-        repo = repo[:-1]
-    if repo.endswith('.git'):
-        repo = repo.replace('.git', '')
-    response = requests.get(f'https://api.github.com/repos/{repo}')
+    repo = github_repo(url)
+    if repo is None:
+        print(f'Could not collect stats for {url}')
+        return
+    response = http_client.get(f'https://api.github.com/repos/{repo}', headers=github_headers())
+    github_budget['rest_requests'] += 1
+    if 'X-RateLimit-Remaining' in response.headers:
+        github_budget['rest_remaining'] = int(response.headers['X-RateLimit-Remaining'])
+        github_budget['rest_limit'] = int(response.headers['X-RateLimit-Limit'])
     if response.status_code == 200:
         repo_record = response.json()
         return {'github_forks': repo_record.get('forks_count', 0),'github_stars': repo_record.get('stargazers_count', 0), 'updated_at': repo_record.get('updated_at', 'NA'), 'created_at': repo_record.get('created_at', 'NA'),'pushed_at': repo_record.get('pushed_at', 'NA'), 'name': repo_record.get('full_name', 'NA')}
@@ -73,52 +142,192 @@ def github_stats(url):
         print(f'Could not collect stats for {url}')
         return
 
-def get_all_artifact_stats(results, url_keys):
+def github_stats_graphql(repos):
+    # one aliased repository() field per repo, owner and name passed as variables
+    fields = []
+    variables = {}
+    for i, repo in enumerate(repos):
+        owner, _, name = repo.partition('/')
+        variables[f'o{i}'] = owner
+        variables[f'n{i}'] = name
+        fields.append(f'r{i}: repository(owner: $o{i}, name: $n{i}) {{ nameWithOwner forkCount stargazerCount createdAt updatedAt pushedAt }}')
+    params = ', '.join(f'$o{i}: String!, $n{i}: String!' for i in range(len(repos)))
+    query = f'query({params}) {{ rateLimit {{ cost remaining limit }} {" ".join(fields)} }}'
+
+    response = http_client.post(GITHUB_GRAPHQL_URL, json={'query': query, 'variables': variables}, headers=github_headers())
+    if response.status_code != 200:
+        print(f'GraphQL query for {len(repos)} repositories failed with {response.status_code}')
+        return None
+    data = response.json().get('data')
+    if data is None:
+        print(f'GraphQL query for {len(repos)} repositories failed: {response.json().get("errors")}')
+        return None
+
+    github_budget['graphql_queries'] += 1
+    if data.get('rateLimit'):
+        github_budget['graphql_cost'] += data['rateLimit']['cost']
+        github_budget['graphql_remaining'] = data['rateLimit']['remaining']
+        github_budget['graphql_limit'] = data['rateLimit']['limit']
+
+    stats = {}
+    for i, repo in enumerate(repos):
+        record = data.get(f'r{i}')
+        if record is None:
+            # missing or private repositories are reported as errors next to the data
+            stats[repo] = None
+            continue
+        stats[repo] = {'github_forks': record['forkCount'], 'github_stars': record['stargazerCount'], 'updated_at': record['updatedAt'], 'created_at': record['createdAt'], 'pushed_at': record['pushedAt'], 'name': record['nameWithOwner']}
+    return stats
+
+def github_stats_batch(urls, backend='auto', on_stats=None):
+    repo_urls = {}
+    for url in urls:
+        repo = github_repo(url)
+        if repo is not None:
+            repo_urls.setdefault(repo, []).append(url)
+    unique_repos = list(repo_urls.keys())
+
+    stats = {}
+    def done(url, url_stats):
+        stats[url] = url_stats
+        if on_stats is not None:
+            on_stats(url, url_stats)
+
+    # GraphQL needs a token, without one only the REST API is available
+    if backend == 'graphql' or (backend == 'auto' and 'GITHUB_TOKEN' in os.environ):
+        for i in range(0, len(unique_repos), GITHUB_BATCH_SIZE):
+            batch = unique_repos[i:i + GITHUB_BATCH_SIZE]
+            batch_stats = github_stats_graphql(batch)
+            if batch_stats is None:
+                continue
+            for repo, repo_stats in batch_stats.items():
+                for url in repo_urls[repo]:
+                    if repo_stats is None:
+                        print(f'Could not collect stats for {url}')
+                    done(url, repo_stats)
+
+    for url in urls:
+        if url not in stats:
+            # REST fallback for failed batches or without GraphQL
+            done(url, github_stats(url))
+    return stats
+
+def print_github_budget():
+    if github_budget['rest_requests']:
+        print(f"GitHub REST API: {github_budget['rest_requests']} requests, remaining {github_budget['rest_remaining']}/{github_budget['rest_limit']}")
+    if github_budget['graphql_queries']:
+        print(f"GitHub GraphQL API: {github_budget['graphql_queries']} queries costing {github_budget['graphql_cost']} points, remaining {github_budget['graphql_remaining']}/{github_budget['graphql_limit']}")
+
+def get_all_artifact_stats(results, url_keys, github_backend='auto', jobs=1, store=None):
+    # collect the urls of every provider up front so they can be fetched in bulk,
+    # each repository or record only once
+    urls = []
+    for name, artifacts in results.items():
+        for url_key in url_keys:
+            for artifact in artifacts:
+                if artifact.get(url_key+'_exists'):
+                    urls.append(artifact[url_key])
+    representatives = group_by_key(urls)
+    provider_urls = {'zenodo': [], 'figshare': [], 'github': []}
+    for (provider, _), url in representatives.items():
+        if provider in provider_urls:
+            provider_urls[provider].append(url)
+
+    provider_stats = {'zenodo': {}, 'figshare': {}, 'github': {}}
+    on_stats = None
+    if store is not None:
+        # resume from the stats of earlier runs that did not expire yet
+        for key, url in representatives.items():
+            stored = store.get_stats(key) if key[0] in provider_urls else None
+            if stored is not None:
+                provider_stats[key[0]][url] = stored
+                provider_urls[key[0]].remove(url)
+        # failed fetches are not stored so that the next run retries them
+        on_stats = lambda url, stats: store.put_stats(canonical_key(url), url, stats) if stats else None
+
+    if provider_urls['zenodo']:
+        with metrics.phase('zenodo_stats'):
+            provider_stats['zenodo'].update(zenodo_stats_batch(provider_urls['zenodo'], on_stats))
+    if provider_urls['figshare']:
+        with metrics.phase('figshare_stats'):
+            provider_stats['figshare'].update(figshare_stats_batch(provider_urls['figshare'], jobs, on_stats))
+    if provider_urls['github']:
+        with metrics.phase('github_stats'):
+            provider_stats['github'].update(github_stats_batch(provider_urls['github'], github_backend, on_stats))
+
     for name, artifacts in results.items():
         for url_key in url_keys:
             print(f'Getting stats for {len(artifacts)}')
             for artifact in artifacts:
                 if url_key+'_exists' in artifact and artifact[url_key+'_exists']:
-                    if 'zenodo' in artifact[url_key]:
-                        stats = zenodo_stats(artifact[url_key])
-                    elif 'figshare' in artifact[url_key]:
-                        stats = figshare_stats(artifact[url_key])
-                    elif 'github' in artifact[url_key]:
-                        stats = github_stats(artifact[url_key])
-                    else: # needed since stats doesn't exist otherwise
+                    key = canonical_key(artifact[url_key])
+                    if key[0] not in provider_stats: # needed since stats doesn't exist otherwise
                         print(f'No stats for {artifact[url_key]} at {name} titled {artifact["title"]}')
                         continue
 
+                    stats = provider_stats[key[0]][representatives[key]]
                     if stats:
                         artifact['stats'] = {**stats, **artifact.get('stats', {})}
                 else:
                     print(f'{url_key} does not exist for {artifact["title"]} at {name}')
 
+    print_github_budget()
     return results
 
-def main():
+def main(argv=None):
 
     parser = argparse.ArgumentParser(description='Scraping results of sys/secartifacts.github.io from conferences.')
     parser.add_argument('--conf_regex', type=str, default='.20[1|2][0-9]', help='Regular expression for conference name and or names')
     parser.add_argument('--prefix', type=str, default='sys', help='Prefix of artifacts website like sys for sysartifacts or sec for secartifacts')
+    parser.add_argument('--jobs', type=int, default=1, help='Number of concurrent downloads of conference files and Figshare stats')
     parser.add_argument('--url_keys', type=str, nargs='+', default=['repository_url'], help='Keys in the artifact dictionary to check the URLs for')
+    parser.add_argument('--github_backend', type=str, choices=['auto', 'graphql', 'rest'], default='auto', help='Fetch GitHub stats in batches over GraphQL or one repository at a time over REST')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Number of URL checks running at once')
+    parser.add_argument('--jsonl', type=str, default=None, help='Also write every artifact with stats as one JSON line to this path while the run progresses')
+    parser.add_argument('--table', type=str, default=None, help='Also write all artifacts as one table, Parquet if the path ends in .parquet, otherwise an Arrow file')
 
-    args = parser.parse_args()
-    results = get_ae_results(args.conf_regex, args.prefix)
-    results, _, _ = check_artifact_exists(results, args.url_keys)
-
-    results = get_all_artifact_stats(results, args.url_keys)
+    http_client.add_arguments(parser)
+    metrics.add_arguments(parser)
+    sys_sec_scrape.add_arguments(parser)
+    artifact_store.add_arguments(parser)
+    args = parser.parse_args(argv)
+    http_client.configure_from_args(args)
+    metrics.configure_from_args(args)
+    sys_sec_scrape.configure_from_args(args)
+    store = artifact_store.open_from_args(args)
+    # imported here since the pipeline builds on the stats functions of this module
+    from artifact_pipeline import stream_artifact_stats
 
+    jsonl = open(args.jsonl, 'w') if args.jsonl else None
+    results = {}
     artifact_id = 0
-    for name, artifacts in results.items():
-        for artifact in artifacts:
-            if 'stats' not in artifact:
-                continue
+    start = time.monotonic()
+    first = None
+    # rows are written as soon as an artifact is checked and its stats arrived
+    for name, artifact in stream_artifact_stats(args.conf_regex, args.prefix, args.url_keys, args.jobs, args.concurrency, args.github_backend, store):
+        if args.table:
+            results.setdefault(name, []).append(artifact)
+        if 'stats' not in artifact:
+            continue
+        if first is None:
+            first = time.monotonic() - start
+
+        for key, value in artifact['stats'].items():
+            print(f'{name},{artifact_id},{key},{value}', flush=True)
+        if jsonl is not None:
+            jsonl.write(json.dumps({'conference': name, 'artifact_id': artifact_id, **artifact}) + '\n')
+            jsonl.flush()
 
-            for key, value in artifact['stats'].items():
-                print(f'{name},{artifact_id},{key},{value}')
+        artifact_id += 1
 
-            artifact_id += 1
+    if jsonl is not None:
+        jsonl.close()
+    print_github_budget()
+    if first is not None:
+        print(f'First stats after {first:.2f}s, {artifact_id} artifacts with stats after {time.monotonic() - start:.2f}s', file=sys.stderr)
+    if args.table:
+        from artifact_table import ArtifactTable
+        ArtifactTable.from_results(results, args.url_keys).write(args.table)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,202 +1,182 @@
 import argparse
-from pytrie import Trie
-import json
-from  thefuzz import fuzz
+import re
+import unicodedata
+from collections import Counter
+import numpy as np
+import http_client
+import metrics
+import sys_sec_scrape
+from affiliations import LEARNED_ALIASES_PATH, add_institutions
+from aggregate import count_by, member_table, ranked
 from sys_sec_committee_scrape import get_committees
-from sys_sec_scrape import download_file
-
-def calculate_affiliation_stats(results):
-    affiliation_stats = {}
-    for name in results.keys():
-        for member in results[name]:
-            affiliation = member['affiliation']
-            if affiliation not in affiliation_stats:
-                affiliation_stats[affiliation] = []
-                affiliation_stats[affiliation].append(member)
-            else:
-                affiliation_stats[affiliation].append(member)
-
-    return affiliation_stats
-
-def calculate_affiliation_stats_per_year(results):
-    affiliation_stats = {}
-    for name in results.keys():
-
-        for member in results[name]:
-            affiliation = member['affiliation']
-            if affiliation not in affiliation_stats:
-                affiliation_stats[affiliation] = {}
-            if name not in affiliation_stats[affiliation]:
-                affiliation_stats[affiliation][name] = []
-            affiliation_stats[affiliation][name].append(member)
-
-    return affiliation_stats
-
-def aec_retention(results):
-    conf_mem_set = {}
-    for conf in results.keys():
-        conf_mem_set[conf] = {}
-        for member in results[conf]:
-            conf_mem_set[conf][member['name']] = True
-
-    retention_counts = {}
-    for name in results.keys():
-        for comp_name in results.keys():
-            if name not in retention_counts:
-                retention_counts[name] = {}
-            retention_counts[name][comp_name] = 0
-
-            for member in conf_mem_set[name].keys():
-                retention_counts[name][comp_name] += 1 if member in conf_mem_set[comp_name] else 0
+from rapidfuzz import fuzz
+from university_index import load_university_index
+
+NAME_SEPARATORS = re.compile(r'[^\w]+')
+FUZZY_NAME_THRESHOLD = 90
+
+def member_institutions(results, raw=False, learned_path=LEARNED_ALIASES_PATH):
+    # member table with the institution of each member, spellings of one institution
+    # like "UIUC" and "University of Illinois Urbana-Champaign" are counted together
+    rows = member_table(results)
+    if raw:
+        for row in rows:
+            row['institution'] = row['affiliation']
+        return rows
+    return add_institutions(rows, learned_path)
+
+def normalize_name(name):
+    # strip accents, case, punctuation and middle initials
+    name = unicodedata.normalize('NFKD', name)
+    name = ''.join(c for c in name if not unicodedata.combining(c)).lower()
+    tokens = NAME_SEPARATORS.sub(' ', name).split()
+    if len(tokens) > 2:
+        tokens = [tokens[0]] + [token for token in tokens[1:-1] if len(token) > 1] + [tokens[-1]]
+    return ' '.join(tokens)
+
+def same_person(name, other):
+    first, other_first = name.split(' ')[0], other.split(' ')[0]
+    # Alex Smith and Alexander Smith, or small spelling differences
+    return first.startswith(other_first) or other_first.startswith(first) or fuzz.ratio(name, other) >= FUZZY_NAME_THRESHOLD
+
+def canonical_names(names, fuzzy=False):
+    canonical = {name: normalize_name(name) for name in names}
+    if not fuzzy:
+        return canonical
+
+    # only names sharing the first initial and last name are compared
+    blocks = {}
+    merged = {}
+    for normalized in dict.fromkeys(canonical.values()):
+        if not normalized:
+            merged[normalized] = normalized
+            continue
+        tokens = normalized.split(' ')
+        block = blocks.setdefault((tokens[0][:1], tokens[-1]), [])
+        merged[normalized] = next((other for other in block if same_person(normalized, other)), normalized)
+        if merged[normalized] == normalized:
+            block.append(normalized)
+    return {name: merged[normalized] for name, normalized in canonical.items()}
+
+def retention_matrix(results, fuzzy=False):
+    conferences = list(results.keys())
+    names = canonical_names([member['name'] for members in results.values() for member in members], fuzzy)
+    # blank lines of the committee pages are not members
+    names = {name: canonical for name, canonical in names.items() if canonical}
+    member_ids = {name: i for i, name in enumerate(dict.fromkeys(names.values()))}
+
+    # member by conference incidence, the product counts shared members of every pair
+    incidence = np.zeros((len(member_ids), len(conferences)), dtype=np.int32)
+    for column, conf in enumerate(conferences):
+        rows = [member_ids[names[member['name']]] for member in results[conf] if member['name'] in names]
+        incidence[rows, column] = 1
+    return conferences, incidence.T @ incidence
+
+def aec_retention(results, fuzzy=False):
+    with metrics.phase('name_matching'):
+        conferences, retention_counts = retention_matrix(results, fuzzy)
 
     # print table header
-    print(f'conferences;{";".join(results.keys())}')
-    for name in results.keys():
-        print(f'{name};{";".join(str(n) for n in retention_counts[name].values())}')
-
-def classify_aec_by_country(results):
-    university_info = json.loads(download_file("https://github.com/Hipo/university-domains-list/raw/refs/heads/master/world_universities_and_domains.json"))
-    university_info.extend([
-        {'name': 'télécom sudparis', 'country': 'France'},
-        {'name': 'ku leuven','country': 'Belgium'},
-        {'name': 'imec-distrinet, ku leuven', 'country': 'Belgium'},
-        {'name': 'university of crete', 'country': 'Greece'},
-        {'name': 'ucla', 'country': 'United States'},
-        {'name': 'tu munich', 'country': 'Germany'},
-        {'name': 'inesc-id & ist u. lisboa in Portugal', 'country': 'Portugal'},
-        {'name': 'ist lisbon & inesc-id', 'country': 'Portugal'},
-        {'name': 'mpi-sws', 'country': 'Germany'},
-        {'name': 'hkust', 'country': 'Hong Kong'},
-        {'name': 'uc irvine', 'country': 'United States'},
-        {'name': 'uiuc', 'country': 'United States'},
-        {'name': 'school of computer science, university college dublin', 'country': 'Ireland'},
-        {'name': 'imdea software institute', 'country': 'Spain'},
-        {'name': 'university of chinese academy of sciences', 'country': 'China'},
-        {'name': 'zhengqing', 'country': 'China'},
-        {'name': 'the university of utah', 'country': 'United States'},
-        {'name': 'institute of parallel and distributed systems, shanghai jiao tong university', 'country': 'China'},
-        {'name': 'computing and imaging institute - the university of utah', 'country': 'United States'},
-        {'name': 'university of crete & ics-forth', 'country': 'Greece'},
-        {'name': 'ics-forth', 'country': 'Greece'},
-        {'name': 'kaust', 'country': 'Saudi Arabia'},
-        {'name': 'lrz', 'country': 'Germany'},
-        {'name': 'ensta bretagne', 'country': 'France'},
-        {'name': 'institute of computing technology chinese academy of sciences', 'country': 'China'},
-        {'name': 'imdea networks institute & uc3m', 'country': 'Spain'},
-        {'name': 'hasso plattner institute', 'country': 'Germany'},
-        {'name': 'unist', 'country': 'South Korea'},
-        {'name': 'niccolò cusano university', 'country': 'Italy'},
-        {'name': 'uc irvine & mpi-sp', 'country': 'United States'},
-        {'name': 'univ. toulouse iii, irit', 'country': 'France'},
-        {'name': 'university of telepegaso,rome,italy', 'country': 'Italy'},
-        {'name': 'leibniz supercomputing center', 'country': 'Germany'},
-        {'name': 'inesc tec & u. minho', 'country': 'Portugal'},
-        {'name': 'barkhausen institut', 'country': 'Germany'},
-        {'name': 'the ohio state university', 'country': 'United States'},
-    ])
-
-    name_index = {}
-    for uni in university_info:
-        name_index[uni['name'].lower()] = uni
-        splitted = uni['name'].split(" ")
-        if len(splitted) > 1:
-            for splitted_name in splitted:
-                name_index[splitted_name.lower()] = uni
-            if len(splitted) > 2:
-                for s_cnt in range(1, len(splitted)-1):
-                    name_index[" ".join(splitted[s_cnt:]).lower()] = uni
-
-
-    prefix_tree = Trie(**name_index)
-    per_year_country_stats = {}
-    failed = []
-    for conf, members in results.items():
-        per_year_country_stats[conf] = {}
-        for member in members:
-            affiliation = member['affiliation'].lower()
-            university = prefix_tree.values(prefix=affiliation)
-
-            if university:
-                university = university[0]
-                #print(f'{affiliation} in {university["country"]} matched')
-                per_year_country_stats[conf][university['country']] = per_year_country_stats[conf].get(university['country'], 0) + 1
+    print(f'conferences;{";".join(conferences)}')
+    for name, counts in zip(conferences, retention_counts):
+        print(f'{name};{";".join(str(n) for n in counts)}')
+
+def match_affiliations(affiliations):
+    # country of every distinct affiliation, None if it could not be matched
+    with metrics.phase('university_index_load'):
+        university_index = load_university_index()
+    countries = {}
+    with metrics.phase('affiliation_matching'):
+        for affiliation, members in Counter(affiliations).items():
+            country = university_index.prefix_match(affiliation)
+
+            if country:
+                #print(f'{affiliation} in {country} matched')
+                metrics.increment('affiliation_prefix_match', members)
             else:
-                best_match = None
-                best_match_ratio = 0
-                for name in name_index.keys():
-                    ratio = fuzz.ratio(name, affiliation)
-                    if ratio > best_match_ratio:
-                        best_match_ratio = ratio
-                        best_match = name_index[name]
+                country, best_match_ratio = university_index.fuzzy_match(affiliation)
 
                 if best_match_ratio > 80:
-                    #print(f'{affiliation} in {best_match["country"]} with ratio {best_match_ratio}')
-                    per_year_country_stats[conf][best_match['country']] = per_year_country_stats[conf].get(best_match['country'], 0) + 1
+                    #print(f'{affiliation} in {country} with ratio {best_match_ratio}')
+                    metrics.increment('affiliation_fuzzy_match', members)
                 else:
-                    failed.append(affiliation)
-                    print(f'Failed {affiliation} in {best_match["country"]} with ratio {best_match_ratio}')
+                    metrics.increment('affiliation_unmatched', members)
+                    print(f'Failed {affiliation} in {country} with ratio {best_match_ratio}')
+                    country = None
+            countries[affiliation] = country
+    return countries
+
+def member_countries(results):
+    # member table with the country of each member's affiliation, each affiliation is matched once
+    rows = member_table(results)
+    countries = match_affiliations(row['affiliation'].lower() for row in rows)
+    for row in rows:
+        row['country'] = countries[row['affiliation'].lower()]
+    return rows
 
+def classify_aec_by_country(results):
+    rows = member_countries(results)
+    per_year_country_stats = {conf: {} for conf in results}
+    per_year_country_stats.update(count_by(rows, 'conference', 'country'))
+    failed = [row['affiliation'].lower() for row in rows if row['country'] is None]
     return per_year_country_stats, failed
 
 def aec_by_country(results):
-    per_year_country_stats, failed = classify_aec_by_country(results)
-
-    # get all affiliations
-    countries = set()
-    for country_year in per_year_country_stats.values():
-        for country in country_year.keys():
-            countries.add(country)
+    rows = member_countries(results)
+    by_country = count_by(rows, 'country', 'conference')
+    failed = [row['affiliation'].lower() for row in rows if row['country'] is None]
 
     # print table header
     print(f'countries;{";".join(results.keys())};sum')
-    for country in sorted(countries):
-        print(f'{country};', end='')
-        sum = 0
-        for conf in per_year_country_stats.keys():
-            print(f'{per_year_country_stats[conf].get(country, 0)}', end=';')
-            sum += per_year_country_stats[conf].get(country, 0)
-        print(f'{sum}')
+    for country in sorted(by_country):
+        counts = [by_country[country].get(conf, 0) for conf in results]
+        print(f'{country};{";".join(str(n) for n in counts)};{sum(counts)}')
 
     print(f'Number failed to identify {len(failed)}')
     print(f'List of failed affiliations:{", ".join(failed)}')
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description='Scraping results of sys/secartifacts.github.io from conferences.')
     parser.add_argument('--conf_regex', type=str, default='.20[1|2][0-9]', help='Regular expression for conference name and or years')
     parser.add_argument('--prefix', type=str, default='sys', help='Prefix of artifacts website like sys for sysartifacts or sec for secartifacts')
+    parser.add_argument('--jobs', type=int, default=1, help='Number of conferences downloaded concurrently')
     parser.add_argument('--analyze_affiliation',  action='store_true', help='Analyze affiliation of committee members')
     parser.add_argument('--analyze_affiliation_per_conference',  action='store_true', help='Analyze affiliation of committee members')
+    parser.add_argument('--raw_affiliations',  action='store_true', help='Count affiliations as they are written instead of resolving spellings of the same institution')
+    parser.add_argument('--affiliation_aliases', type=str, default=LEARNED_ALIASES_PATH, help='File of the affiliation aliases learned by earlier runs')
     parser.add_argument('--analyze_aec_retention',  action='store_true', help='Analyze if AEC members stay over multiple years or between conferences')
+    parser.add_argument('--fuzzy_names',  action='store_true', help='Merge member names with the same first initial and last name that differ only slightly for the retention analysis')
     parser.add_argument('--analyze_by_country',  action='store_true', help='Analyze from which countries AEC members are')
 
-    args = parser.parse_args()
+    http_client.add_arguments(parser)
+    metrics.add_arguments(parser)
+    sys_sec_scrape.add_arguments(parser)
+    args = parser.parse_args(argv)
+    http_client.configure_from_args(args)
+    metrics.configure_from_args(args)
+    sys_sec_scrape.configure_from_args(args)
 
-    results = get_committees(args.conf_regex, args.prefix)
+    results = get_committees(args.conf_regex, args.prefix, args.jobs)
 
     if args.analyze_affiliation:
-        affiliation_stats = calculate_affiliation_stats(results)
+        affiliation_stats = count_by(member_institutions(results, args.raw_affiliations, args.affiliation_aliases), 'institution')
         # print table header
         print("Affiliation; Count")
-        for affiliation in sorted(affiliation_stats, key=lambda x: len(affiliation_stats[x]), reverse=True):
-            print(f"{affiliation}; {len(affiliation_stats[affiliation])}")
+        for affiliation, count in ranked(affiliation_stats):
+            print(f"{affiliation}; {count}")
 
     if args.analyze_affiliation_per_conference:
-        affiliation_stats = calculate_affiliation_stats_per_year(results)
+        affiliation_stats = count_by(member_institutions(results, args.raw_affiliations, args.affiliation_aliases), 'institution', 'conference')
         # print table header
         print(f'Affiliation;{";".join(results.keys())};sum')
 
-        for affiliation in sorted(affiliation_stats.items()):
-            counts = []
-            for conference in results.keys():
-                if(conference in affiliation_stats[affiliation[0]]):
-                    counts.append(len(affiliation_stats[affiliation[0]][conference]))
-                else:
-                    counts.append(0)
-            print(f'{affiliation[0]};{";".join(str(i) for i in counts)};{sum(counts)}')
+        for affiliation in sorted(affiliation_stats):
+            counts = [affiliation_stats[affiliation].get(conference, 0) for conference in results]
+            print(f'{affiliation};{";".join(str(i) for i in counts)};{sum(counts)}')
 
     if args.analyze_aec_retention:
 
-        aec_retention(results)
+        aec_retention(results, args.fuzzy_names)
 
     if args.analyze_by_country:
 
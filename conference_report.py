@@ -0,0 +1,112 @@
+import argparse
+import json
+import os
+import re
+import numpy as np
+import http_client
+import metrics
+import sys_sec_scrape
+from artifact_table import ArtifactTable, conference_year
+from sys_sec_artifacts_results_scrape import get_ae_results
+from sys_sec_committee_scrape import get_committees
+
+ACCEPTED_PAPERS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'accepted_papers.json')
+BADGES = ['available', 'functional', 'reproduced']
+# spellings of the badges on the artifact websites, e.g. 'Artifacts Available' or 'results reproduced'
+BADGE_PATTERNS = {
+    'available': re.compile(r'avail'),
+    'functional': re.compile(r'function'),
+    'reproduced': re.compile(r'reproduc|replicat'),
+}
+
+def badge_set(badges):
+    # badges are a comma separated string or a list
+    if badges is None:
+        return set()
+    if isinstance(badges, (list, tuple)):
+        badges = ','.join(str(badge) for badge in badges)
+    found = set()
+    for badge in badges.lower().split(','):
+        for name, pattern in BADGE_PATTERNS.items():
+            if pattern.search(badge):
+                found.add(name)
+    return found
+
+def load_accepted_papers(path=ACCEPTED_PAPERS_PATH):
+    # hand entered number of accepted papers per conference, not listed on the artifact websites
+    if path is None or not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def percent(numerator, denominator):
+    # NaN where the denominator is missing or zero
+    return np.where(denominator > 0, np.round(100 * numerator / np.maximum(denominator, 1), 1), np.nan)
+
+def column(values):
+    # json friendly list with None for missing values
+    return [None if np.isnan(value) else float(value) for value in values]
+
+def conference_report(results, committees=None, accepted_papers=None):
+    committees = committees or {}
+    accepted_papers = accepted_papers or {}
+    conferences = sorted(results, key=lambda name: (conference_year(name), name))
+    table = ArtifactTable.from_results({name: results[name] for name in conferences}, [])
+    index = {name: i for i, name in enumerate(conferences)}
+    rows = np.fromiter((index[name] for name in table['conference']), dtype=np.intp, count=len(table))
+    flags = np.array([[badge in badges for badge in BADGES] for badges in map(badge_set, table['badges'])], dtype=bool).reshape(-1, len(BADGES))
+
+    submissions = np.bincount(rows, minlength=len(conferences))
+    counts = {badge: np.bincount(rows, weights=flags[:, i], minlength=len(conferences)).astype(int) for i, badge in enumerate(BADGES)}
+    accepted = np.array([accepted_papers.get(name, np.nan) for name in conferences], dtype=np.float64)
+    # lines of a committee page without a member name are not members
+    aec_size = np.array([sum(1 for member in committees[name] if member['name'].strip()) if name in committees else np.nan for name in conferences], dtype=np.float64)
+
+    # keys follow the table the eurosys figures were first drawn from
+    return {
+        'Conferences': conferences,
+        'Years': [float(conference_year(name)) for name in conferences],
+        'AEC size': column(aec_size),
+        'AE submissions': submissions.tolist(),
+        'Accepted Papers': column(accepted),
+        '% submitted': column(percent(submissions, accepted)),
+        'Artifact Available': counts['available'].tolist(),
+        'Artifact Functional': counts['functional'].tolist(),
+        'Results Reproduced': counts['reproduced'].tolist(),
+        '% available sub': column(percent(counts['available'], submissions)),
+        '% functional sub': column(percent(counts['functional'], submissions)),
+        '% reproduced sub': column(percent(counts['reproduced'], submissions)),
+        '% available pap': column(percent(counts['available'], accepted)),
+        '% functional pap': column(percent(counts['functional'], accepted)),
+        '% reproduced pap': column(percent(counts['reproduced'], accepted)),
+    }
+
+def has_accepted_papers(report):
+    return all(value is not None for value in report['Accepted Papers'])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Badge counts, badge rates and AEC sizes per conference of sys/secartifacts.github.io.')
+    parser.add_argument('--conf_regex', type=str, default='eurosys20', help='Regular expression for conference name and or years')
+    parser.add_argument('--prefix', type=str, default='sys', help='Prefix of artifacts website like sys for sysartifacts or sec for secartifacts')
+    parser.add_argument('--jobs', type=int, default=1, help='Number of conferences downloaded concurrently')
+    parser.add_argument('--accepted_papers', type=str, default=ACCEPTED_PAPERS_PATH, help='JSON file with the number of accepted papers per conference')
+
+    http_client.add_arguments(parser)
+    metrics.add_arguments(parser)
+    sys_sec_scrape.add_arguments(parser)
+    args = parser.parse_args(argv)
+    http_client.configure_from_args(args)
+    metrics.configure_from_args(args)
+    sys_sec_scrape.configure_from_args(args)
+
+    results = get_ae_results(args.conf_regex, args.prefix, args.jobs)
+    committees = get_committees(args.conf_regex, args.prefix, args.jobs)
+    report = conference_report(results, committees, load_accepted_papers(args.accepted_papers))
+
+    keys = [key for key in report if key != 'Conferences']
+    print(','.join(['Conference'] + keys))
+    for i, name in enumerate(report['Conferences']):
+        print(','.join([name] + ['' if report[key][i] is None else str(report[key][i]) for key in keys]))
+
+if __name__ == "__main__":
+    main()
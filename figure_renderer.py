@@ -0,0 +1,93 @@
+import hashlib
+import inspect
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib.pyplot as plt
+
+MANIFEST_NAME = '.render_manifest.json'
+
+def init_worker(rc):
+    # figures are only written to files, no gui backend is needed
+    plt.switch_backend('Agg')
+    plt.rcParams.update(rc)
+
+def render(path, draw, kwargs):
+    # draw works on the current pyplot figure, which is closed whatever happens
+    fig = plt.figure()
+    try:
+        draw(**kwargs)
+        fig.savefig(path, bbox_inches='tight')
+    finally:
+        plt.close(fig)
+    return path
+
+class FigureRenderer:
+    def __init__(self, folder='figures', processes=None, rc=None):
+        self.folder = folder
+        self.processes = processes or os.cpu_count()
+        self.rc = rc or {}
+        self.jobs = []
+        os.makedirs(folder, exist_ok=True)
+
+    def add(self, filename, draw, **kwargs):
+        self.jobs.append((os.path.join(self.folder, filename), draw, kwargs))
+
+    def job_hash(self, draw, kwargs):
+        # changes with the data of the figure and the code drawing it
+        content = json.dumps([inspect.getsource(draw), self.rc, kwargs], sort_keys=True)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def manifest_path(self):
+        return os.path.join(self.folder, MANIFEST_NAME)
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path(), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_manifest(self, manifest):
+        with open(self.manifest_path() + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=4)
+        os.replace(self.manifest_path() + '.tmp', self.manifest_path())
+
+    def run(self, force=False):
+        start = time.monotonic()
+        manifest = self.load_manifest()
+        stale = []
+        for path, draw, kwargs in self.jobs:
+            job_hash = self.job_hash(draw, kwargs)
+            if force or manifest.get(path) != job_hash or not os.path.exists(path):
+                stale.append((path, draw, kwargs, job_hash))
+
+        rendered = []
+        if len(stale) <= 1 or self.processes == 1:
+            # not worth starting worker processes
+            init_worker(self.rc)
+            outcomes = []
+            for path, draw, kwargs, job_hash in stale:
+                try:
+                    render(path, draw, kwargs)
+                    outcomes.append((path, job_hash, None))
+                except Exception as e:
+                    outcomes.append((path, job_hash, e))
+        else:
+            with ProcessPoolExecutor(min(self.processes, len(stale)), initializer=init_worker, initargs=(self.rc,)) as executor:
+                futures = [(executor.submit(render, path, draw, kwargs), path, job_hash) for path, draw, kwargs, job_hash in stale]
+                outcomes = [(path, job_hash, future.exception()) for future, path, job_hash in futures]
+
+        for path, job_hash, error in outcomes:
+            if error is None:
+                manifest[path] = job_hash
+                rendered.append(path)
+            else:
+                print(f'Could not render {path}: {error}')
+        if rendered:
+            self.save_manifest(manifest)
+
+        print(f'Rendered {len(rendered)} of {len(self.jobs)} figures, {len(self.jobs) - len(stale)} up to date, took {time.monotonic() - start:.2f}s')
+        self.jobs = []
+        return rendered
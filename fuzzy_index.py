@@ -0,0 +1,50 @@
+import numpy as np
+from rapidfuzz import fuzz, process
+
+NGRAM_SIZE = 3
+# number of candidates with the most shared n-grams that are scored exactly
+SHORTLIST_SIZE = 64
+
+def ngrams(text, n=NGRAM_SIZE):
+    padded = f' {text} '
+    return {padded[i:i+n] for i in range(max(len(padded) - n + 1, 1))}
+
+class FuzzyIndex:
+    def __init__(self, names):
+        self.names = list(names)
+        postings = {}
+        for i, name in enumerate(self.names):
+            for gram in ngrams(name):
+                postings.setdefault(gram, []).append(i)
+        # all posting lists live in one array, grams map to their slice of it
+        self.grams = {}
+        offset = 0
+        for gram, ids in postings.items():
+            self.grams[gram] = (offset, offset + len(ids))
+            offset += len(ids)
+        self.postings = np.fromiter((i for ids in postings.values() for i in ids), dtype=np.int32, count=offset)
+        self.matches = {}
+
+    def shortlist(self, query):
+        lists = [self.postings[slice(*self.grams[gram])] for gram in ngrams(query) if gram in self.grams]
+        if not lists:
+            return []
+        shared = np.bincount(np.concatenate(lists), minlength=len(self.names))
+        candidates = np.flatnonzero(shared)
+        if len(candidates) > SHORTLIST_SIZE:
+            candidates = candidates[np.argpartition(shared[candidates], -SHORTLIST_SIZE)[-SHORTLIST_SIZE:]]
+        return [self.names[i] for i in candidates]
+
+    def best_match(self, query, threshold=80):
+        # returns the best matching name and its ratio, rounded like thefuzz.fuzz.ratio
+        if query in self.matches:
+            return self.matches[query]
+
+        # only the shortlist is scored, a name that shares few n-grams with the query is not
+        # found even if its ratio is above the threshold; names above a ratio of 80 share most
+        # of their n-grams, so this trades a small loss of recall for not scanning every name
+        match = process.extractOne(query, self.shortlist(query), scorer=fuzz.ratio)
+
+        result = (match[0], int(round(match[1]))) if match is not None else (None, 0)
+        self.matches[query] = result
+        return result
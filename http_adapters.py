@@ -0,0 +1,69 @@
+import time
+import requests
+import http_client
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# the parts of http_client that need requests, imported with the first request
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    pass
+
+class CappedRetry(Retry):
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, http_client.MAX_RETRY_AFTER)
+
+    def increment(self, *args, **kwargs):
+        retry = super().increment(*args, **kwargs)
+        remaining = http_client.remaining_time()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded('Global deadline for network requests exceeded before a retry')
+        return retry
+
+    def sleep(self, response=None):
+        # a backoff or Retry-After wait that ends past the deadline is not started
+        remaining = http_client.remaining_time()
+        if remaining is not None:
+            wait = self.get_retry_after(response) if response is not None and self.respect_retry_after_header else None
+            # like urllib3, a missing or zero Retry-After falls back to the backoff
+            if not wait:
+                wait = self.get_backoff_time()
+            if wait >= remaining:
+                raise DeadlineExceeded(f'Global deadline for network requests exceeded, {wait:.0f}s wait before the retry')
+        start = time.monotonic()
+        super().sleep(response)
+        current = http_client._current
+        current.retry_sleep = getattr(current, 'retry_sleep', 0.0) + time.monotonic() - start
+
+class RewritingAdapter(HTTPAdapter):
+    # rewriting in the adapter also covers redirects followed by requests itself
+    def send(self, request, **kwargs):
+        if http_client.settings['url_rewrite'] is not None:
+            request.url = http_client.rewrite_url(request.url)
+        try:
+            return super().send(request, **kwargs)
+        except requests.exceptions.ConnectionError as e:
+            # requests wraps every OSError, deadlines raised by CappedRetry stay timeouts
+            if e.args and isinstance(e.args[0], DeadlineExceeded):
+                raise e.args[0]
+            raise
+
+def new_session(retry_statuses):
+    settings = http_client.settings
+    retry = CappedRetry(
+        total=settings['retries'],
+        backoff_factor=settings['backoff'],
+        status_forcelist=retry_statuses,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    # one pool per host, reused over keep-alive connections
+    adapter = RewritingAdapter(pool_connections=settings['pool_size'], pool_maxsize=settings['pool_size'], max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
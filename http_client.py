@@ -0,0 +1,123 @@
+import threading
+import time
+import metrics
+from urllib.parse import urlsplit
+
+# connect and read timeout in seconds
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 30
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 1.0
+DEFAULT_POOL_SIZE = 32
+# longest Retry-After we are willing to sleep inside a single request
+MAX_RETRY_AFTER = 60
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+settings = {
+    'connect_timeout': DEFAULT_CONNECT_TIMEOUT,
+    'read_timeout': DEFAULT_READ_TIMEOUT,
+    'retries': DEFAULT_RETRIES,
+    'backoff': DEFAULT_BACKOFF,
+    'pool_size': DEFAULT_POOL_SIZE,
+    'deadline': None,
+    # base url of a local stand-in that receives every request instead of the real hosts
+    'url_rewrite': None,
+}
+
+_sessions = {}
+_lock = threading.Lock()
+# retry sleeps of the request running on this thread
+_current = threading.local()
+
+def rewrite_url(url):
+    # https://zenodo.org/api/records?q=1 becomes <url_rewrite>/zenodo.org/api/records?q=1
+    parts = urlsplit(url)
+    query = f'?{parts.query}' if parts.query else ''
+    return f"{settings['url_rewrite'].rstrip('/')}/{parts.netloc}{parts.path}{query}"
+
+def configure(connect_timeout=None, read_timeout=None, retries=None, backoff=None, pool_size=None, deadline=None, url_rewrite=None):
+    with _lock:
+        if connect_timeout is not None:
+            settings['connect_timeout'] = connect_timeout
+        if read_timeout is not None:
+            settings['read_timeout'] = read_timeout
+        if retries is not None:
+            settings['retries'] = retries
+        if backoff is not None:
+            settings['backoff'] = backoff
+        if pool_size is not None:
+            settings['pool_size'] = pool_size
+        if deadline is not None:
+            # deadline is given in seconds from now and covers the whole run
+            settings['deadline'] = time.monotonic() + deadline
+        if url_rewrite is not None:
+            settings['url_rewrite'] = url_rewrite
+
+        # sessions are rebuilt lazily with the new adapter settings
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+def get_session(retry_statuses=RETRY_STATUSES):
+    # requests takes long to import, scripts that make no request do not pay for it
+    from http_adapters import new_session
+    retry_statuses = tuple(retry_statuses)
+    with _lock:
+        session = _sessions.get(retry_statuses)
+        if session is None:
+            session = new_session(retry_statuses)
+            _sessions[retry_statuses] = session
+        return session
+
+def remaining_time():
+    if settings['deadline'] is None:
+        return None
+    return settings['deadline'] - time.monotonic()
+
+def request_timeout(timeout=None):
+    if timeout is None:
+        timeout = (settings['connect_timeout'], settings['read_timeout'])
+    elif not isinstance(timeout, tuple):
+        timeout = (timeout, timeout)
+
+    remaining = remaining_time()
+    if remaining is None:
+        return timeout
+    if remaining <= 0:
+        from http_adapters import DeadlineExceeded
+        raise DeadlineExceeded('Global deadline for network requests exceeded')
+    return (min(timeout[0], remaining), min(timeout[1], remaining))
+
+def request(method, url, timeout=None, retry_statuses=RETRY_STATUSES, **kwargs):
+    import requests
+    session = get_session(retry_statuses)
+    host = urlsplit(url).hostname or ''
+    _current.retry_sleep = 0.0
+    start = time.monotonic()
+    try:
+        response = session.request(method, url, timeout=request_timeout(timeout), **kwargs)
+    except requests.exceptions.RequestException:
+        metrics.record_request(host, None, time.monotonic() - start, retry_sleep=_current.retry_sleep)
+        raise
+    retries = response.raw.retries
+    metrics.record_request(host, response.status_code, time.monotonic() - start, len(response.content), len(retries.history) if retries else 0, _current.retry_sleep)
+    return response
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+def head(url, **kwargs):
+    return request('HEAD', url, **kwargs)
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
+
+def add_arguments(parser):
+    parser.add_argument('--connect_timeout', type=float, default=DEFAULT_CONNECT_TIMEOUT, help='Connect timeout in seconds for every HTTP request')
+    parser.add_argument('--read_timeout', type=float, default=DEFAULT_READ_TIMEOUT, help='Read timeout in seconds for every HTTP request')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES, help='Number of retries for failed or rate limited HTTP requests')
+    parser.add_argument('--backoff', type=float, default=DEFAULT_BACKOFF, help='Exponential backoff factor in seconds between retries')
+    parser.add_argument('--deadline', type=float, default=None, help='Global deadline in seconds after which no further HTTP requests are made')
+
+def configure_from_args(args):
+    configure(connect_timeout=args.connect_timeout, read_timeout=args.read_timeout, retries=args.retries, backoff=args.backoff, deadline=args.deadline)
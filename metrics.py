@@ -0,0 +1,150 @@
+import atexit
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# upper bounds in seconds of the request latency histogram
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, math.inf)
+
+_lock = threading.Lock()
+_hosts = {}
+_phases = {}
+_events = {}
+_started = time.time()
+
+def _host(host):
+    # callers hold _lock
+    if host not in _hosts:
+        _hosts[host] = {
+            'requests': 0,
+            'errors': 0,
+            'statuses': {},
+            'bytes': 0,
+            'latency_sum': 0.0,
+            'latency_buckets': [0] * len(LATENCY_BUCKETS),
+            'retries': 0,
+            'retry_sleep_seconds': 0.0,
+            'rate_limit_wait_seconds': 0.0,
+        }
+    return _hosts[host]
+
+def record_request(host, status, seconds, size=0, retries=0, retry_sleep=0.0):
+    # status is None for requests that failed without a response
+    with _lock:
+        stats = _host(host)
+        stats['requests'] += 1
+        if status is None:
+            stats['errors'] += 1
+        else:
+            stats['statuses'][str(status)] = stats['statuses'].get(str(status), 0) + 1
+        stats['bytes'] += size
+        stats['latency_sum'] += seconds
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                stats['latency_buckets'][i] += 1
+                break
+        stats['retries'] += retries
+        stats['retry_sleep_seconds'] += retry_sleep
+
+def record_rate_limit_wait(host, seconds):
+    # time spent waiting for a host's rate limiter or a Retry-After pause
+    with _lock:
+        _host(host)['rate_limit_wait_seconds'] += seconds
+
+def increment(event, count=1):
+    with _lock:
+        _events[event] = _events.get(event, 0) + count
+
+@contextmanager
+def phase(name):
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        seconds = time.monotonic() - start
+        with _lock:
+            stats = _phases.setdefault(name, {'runs': 0, 'seconds': 0.0})
+            stats['runs'] += 1
+            stats['seconds'] += seconds
+
+def summary():
+    with _lock:
+        hosts = json.loads(json.dumps(_hosts))
+        phases = json.loads(json.dumps(_phases))
+        events = dict(_events)
+    for stats in hosts.values():
+        stats['latency_mean'] = stats['latency_sum'] / stats['requests'] if stats['requests'] else None
+        stats['latency_buckets'] = {('+Inf' if math.isinf(bound) else str(bound)): count for bound, count in zip(LATENCY_BUCKETS, stats['latency_buckets'])}
+    return {
+        'started_at': _started,
+        'duration_seconds': time.time() - _started,
+        'hosts': hosts,
+        'phases': phases,
+        'events': events,
+    }
+
+def label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def prometheus(data):
+    lines = []
+    def metric(name, kind, help_text, samples):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in samples:
+            labels = ','.join(f'{key}="{label(val)}"' for key, val in labels.items())
+            lines.append(f'{name}{{{labels}}} {value}')
+
+    hosts = data['hosts']
+    metric('artifact_analysis_http_requests_total', 'counter', 'HTTP requests by host and status code, status "error" for requests without a response',
+           [({'host': host, 'status': status}, count) for host, stats in hosts.items() for status, count in list(stats['statuses'].items()) + [('error', stats['errors'])] if count])
+
+    lines.append('# HELP artifact_analysis_http_request_duration_seconds Latency of HTTP requests including retries')
+    lines.append('# TYPE artifact_analysis_http_request_duration_seconds histogram')
+    for host, stats in hosts.items():
+        cumulative = 0
+        for bound, count in stats['latency_buckets'].items():
+            cumulative += count
+            lines.append(f'artifact_analysis_http_request_duration_seconds_bucket{{host="{label(host)}",le="{bound}"}} {cumulative}')
+        lines.append(f'artifact_analysis_http_request_duration_seconds_sum{{host="{label(host)}"}} {stats["latency_sum"]}')
+        lines.append(f'artifact_analysis_http_request_duration_seconds_count{{host="{label(host)}"}} {stats["requests"]}')
+
+    metric('artifact_analysis_http_response_bytes_total', 'counter', 'Bytes of response bodies by host',
+           [({'host': host}, stats['bytes']) for host, stats in hosts.items()])
+    metric('artifact_analysis_http_retries_total', 'counter', 'Retries of failed or rate limited requests by host',
+           [({'host': host}, stats['retries']) for host, stats in hosts.items()])
+    metric('artifact_analysis_http_retry_sleep_seconds_total', 'counter', 'Seconds slept between retries by host',
+           [({'host': host}, stats['retry_sleep_seconds']) for host, stats in hosts.items()])
+    metric('artifact_analysis_rate_limit_wait_seconds_total', 'counter', 'Seconds waited for per host rate limits and Retry-After pauses',
+           [({'host': host}, stats['rate_limit_wait_seconds']) for host, stats in hosts.items()])
+    metric('artifact_analysis_phase_seconds_total', 'counter', 'Seconds spent in processing phases',
+           [({'phase': name}, stats['seconds']) for name, stats in data['phases'].items()])
+    metric('artifact_analysis_phase_runs_total', 'counter', 'Number of runs of processing phases',
+           [({'phase': name}, stats['runs']) for name, stats in data['phases'].items()])
+    metric('artifact_analysis_events_total', 'counter', 'Counted events, e.g. how affiliations were matched',
+           [({'event': name}, count) for name, count in data['events'].items()])
+    return '\n'.join(lines) + '\n'
+
+def write(path):
+    # json summary at path and a prometheus textfile next to it
+    data = summary()
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=4)
+    # the textfile collector may read at any time, so the file is replaced atomically
+    prom_path = os.path.splitext(path)[0] + '.prom'
+    with open(prom_path + '.tmp', 'w') as f:
+        f.write(prometheus(data))
+    os.replace(prom_path + '.tmp', prom_path)
+    print(f'Metrics written to {path} and {prom_path}')
+
+def add_arguments(parser):
+    parser.add_argument('--metrics', type=str, default=None, help='Write per host request counts, latencies, status codes, retries and bytes plus phase timings as JSON to this path and as Prometheus textfile next to it')
+
+def configure_from_args(args):
+    if args.metrics:
+        atexit.register(write, args.metrics)
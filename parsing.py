@@ -0,0 +1,91 @@
+import html
+import re
+import yaml
+
+# the libyaml loader is several times faster, PyYAML builds without it fall back to the python one
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+FRONT_MATTER = '---'
+# a front matter block ends with a line of three dashes
+FRONT_MATTER_END = re.compile(r'^---[ \t]*\r?$', re.M)
+AEC_HEADING = 'Artifact Evaluation Committee'
+
+LIST_MARKER = re.compile(r'^[-*]')
+# - name (affiliation), eurosys 2022 and older
+PARENTHESES = re.compile(r'([^(]*)\(([^)]*)\)')
+# - name, affiliation, eurosys 2021
+COMMA = re.compile(r'([^,]*),([^,]*)')
+TABLE_SEPARATOR = re.compile(r'^[\s|:-]*$')
+TABLE_HEADERS = {'name', 'member', 'members'}
+HTML_TAG = re.compile(r'<[^>]+>')
+HTML_ROW = re.compile(r'<tr[^>]*>(.*?)</tr>', re.S | re.I)
+HTML_CELL = re.compile(r'<t([dh])[^>]*>(.*?)</t[dh]>', re.S | re.I)
+
+def front_matter(content):
+    # text between the first --- and the line closing it, only that part of the page is copied
+    start = content.find(FRONT_MATTER)
+    if start < 0:
+        return None
+    start += len(FRONT_MATTER)
+    end = FRONT_MATTER_END.search(content, start)
+    return content[start:end.start() if end else len(content)]
+
+def parse_front_matter(content):
+    # raises yaml.YAMLError for malformed front matter
+    text = front_matter(content)
+    return None if text is None else yaml.load(text, Loader=YAML_LOADER)
+
+def parse_member(line):
+    # {'name': name, 'affiliation': affiliation} of one line of a committee list, None for blank and markup lines
+    if not line.strip():
+        return None
+    if '<' in line:
+        text = html.unescape(HTML_TAG.sub('', line)).strip()
+        if not text:
+            # <ul>, <table> and the like
+            return None
+        line = text
+    if line.startswith('|'):
+        return parse_table_row(line)
+
+    start = 2 if LIST_MARKER.match(line) else 0
+    match = PARENTHESES.match(line, start)
+    if match:
+        return {'name': match.group(1).strip(), 'affiliation': match.group(2).strip()}
+    match = COMMA.match(line, start)
+    if match:
+        return {'name': match.group(1).strip(), 'affiliation': match.group(2).strip()}
+    # unknown format
+    return {'name': line.strip(), 'affiliation': ''}
+
+def parse_table_row(line):
+    # | name | affiliation | markdown tables, the header and separator rows are skipped
+    if TABLE_SEPARATOR.match(line):
+        return None
+    cells = [cell.strip() for cell in line.strip().strip('|').split('|')]
+    if cells[0].lower() in TABLE_HEADERS:
+        return None
+    return {'name': cells[0], 'affiliation': cells[1] if len(cells) > 1 else ''}
+
+def parse_html_rows(aec):
+    committee = []
+    for row in HTML_ROW.findall(aec):
+        cells = HTML_CELL.findall(row)
+        # header rows are made of <th> cells
+        if not cells or all(kind.lower() == 'h' for kind, _ in cells):
+            continue
+        name, *rest = [html.unescape(HTML_TAG.sub('', cell)).strip() for _, cell in cells]
+        committee.append({'name': name, 'affiliation': rest[0] if rest else ''})
+    return committee
+
+def parse_committee(content):
+    # members listed below the last Artifact Evaluation Committee heading of a committee page
+    aec = content.rpartition(AEC_HEADING)[2].strip()
+    if HTML_ROW.search(aec):
+        return parse_html_rows(aec)
+    committee = []
+    for line in aec.splitlines():
+        member = parse_member(line)
+        if member is not None:
+            committee.append(member)
+    return committee
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import time
+
+CACHE_DIR = 'cache/results'
+DEFAULT_MAX_SIZE_MB = 1024
+DEFAULT_MAX_AGE_HOURS = 24 * 30
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def code_version(*modules):
+    # hash of the code and data files that produce a cached value, modules or paths
+    digest = hashlib.sha256()
+    for module in modules:
+        path = module if isinstance(module, str) else module.__file__
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+class ResultCache:
+    # entries are keyed on the parameters that produced them and point to an object
+    # named by the hash of its content, so equal results are only stored once
+
+    def __init__(self, path=CACHE_DIR, max_size_mb=DEFAULT_MAX_SIZE_MB, max_age_hours=DEFAULT_MAX_AGE_HOURS):
+        self.path = path
+        self.max_size = max_size_mb * 2**20 if max_size_mb is not None else None
+        self.max_age = max_age_hours * 3600 if max_age_hours is not None else None
+        os.makedirs(os.path.join(path, 'objects'), exist_ok=True)
+        os.makedirs(os.path.join(path, 'refs'), exist_ok=True)
+        self.evict()
+
+    def key(self, name, params):
+        return hashlib.sha256(json.dumps([name, params], sort_keys=True).encode()).hexdigest()
+
+    def ref_path(self, key):
+        return os.path.join(self.path, 'refs', key + '.json')
+
+    def object_path(self, digest):
+        return os.path.join(self.path, 'objects', digest)
+
+    def read_ref(self, key):
+        try:
+            with open(self.ref_path(key), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def write_ref(self, key, ref):
+        path = self.ref_path(key)
+        with open(f'{path}.{os.getpid()}.tmp', 'w') as f:
+            json.dump(ref, f, indent=4)
+        os.replace(f'{path}.{os.getpid()}.tmp', path)
+
+    def is_expired(self, ref):
+        return self.max_age is not None and time.time() - ref['created_at'] > self.max_age
+
+    def get(self, name, params):
+        # path of the cached object, None if there is no fresh entry
+        key = self.key(name, params)
+        ref = self.read_ref(key)
+        if ref is None or self.is_expired(ref) or not os.path.exists(self.object_path(ref['object'])):
+            return None
+        ref['used_at'] = time.time()
+        self.write_ref(key, ref)
+        return self.object_path(ref['object'])
+
+    def put(self, name, params, write):
+        # write(path) creates the file that is stored for these parameters
+        key = self.key(name, params)
+        tmp_path = os.path.join(self.path, 'objects', f'.{key}.{os.getpid()}.tmp')
+        write(tmp_path)
+        digest = file_digest(tmp_path)
+        now = time.time()
+        # the ref is written first so a concurrent eviction does not drop the object
+        self.write_ref(key, {
+            'name': name,
+            'params': params,
+            'object': digest,
+            'size': os.path.getsize(tmp_path),
+            'created_at': now,
+            'used_at': now,
+        })
+        if os.path.exists(self.object_path(digest)):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, self.object_path(digest))
+        self.evict()
+        return self.object_path(digest)
+
+    def json(self, name, params, compute):
+        path = self.get(name, params)
+        if path is not None:
+            with open(path, 'r') as f:
+                return json.load(f)
+        value = compute()
+        def write(path):
+            with open(path, 'w') as f:
+                json.dump(value, f)
+        self.put(name, params, write)
+        return value
+
+    def evict(self):
+        refs = {}
+        for filename in os.listdir(os.path.join(self.path, 'refs')):
+            if not filename.endswith('.json'):
+                continue
+            key = filename[:-len('.json')]
+            ref = self.read_ref(key)
+            if ref is None or self.is_expired(ref):
+                os.remove(self.ref_path(key))
+            else:
+                refs[key] = ref
+
+        if self.max_size is not None:
+            # least recently used entries go first, shared objects count once
+            size = 0
+            kept = set()
+            for key, ref in sorted(refs.items(), key=lambda item: item[1]['used_at'], reverse=True):
+                if ref['object'] in kept:
+                    continue
+                if size + ref['size'] > self.max_size:
+                    os.remove(self.ref_path(key))
+                    del refs[key]
+                else:
+                    size += ref['size']
+                    kept.add(ref['object'])
+
+        referenced = {ref['object'] for ref in refs.values()}
+        for filename in os.listdir(os.path.join(self.path, 'objects')):
+            if not filename.endswith('.tmp') and filename not in referenced:
+                os.remove(self.object_path(filename))
+
+def add_arguments(parser):
+    parser.add_argument('--cache_dir', type=str, default=CACHE_DIR, help='Folder of the result cache, entries are keyed on the parameters and sources that produced them')
+    parser.add_argument('--cache_max_size', type=float, default=DEFAULT_MAX_SIZE_MB, help='Size in MB above which the least recently used cache entries are evicted')
+    parser.add_argument('--cache_max_age', type=float, default=DEFAULT_MAX_AGE_HOURS, help='Hours after which cache entries are computed again')
+
+def open_from_args(args):
+    return ResultCache(args.cache_dir, args.cache_max_size, args.cache_max_age)
@@ -0,0 +1,63 @@
+import copy
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import sys_sec_scrape
+from sys_sec_scrape import get_conferences_from_prefix
+
+class Session:
+    # conference listing and per conference files of one prefix, each fetched at most once
+    # per process and shared by every analysis that runs in it
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.listing = None
+        # (kind, conference) -> future of the parsed file
+        self.fetches = {}
+
+    def conferences(self):
+        with self.lock:
+            if self.listing is None:
+                self.listing = get_conferences_from_prefix(self.prefix)
+            return self.listing
+
+    def names(self, conference_regex):
+        # dict.fromkeys drops duplicate names but keeps the listing order
+        return list(dict.fromkeys(conf['name'] for conf in self.conferences() if re.search(conference_regex, conf['name'])))
+
+    def iter(self, kind, conference_regex, fetch, jobs=1):
+        # yields (conference, value) in listing order as soon as each value is there, fetch(name, prefix)
+        # only runs for conferences no earlier call asked for
+        if self.conferences() is None:
+            print(f"Invalid prefix: {self.prefix}")
+            return
+        names = self.names(conference_regex)
+        with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+            with self.lock:
+                futures = []
+                for name in names:
+                    if (kind, name) not in self.fetches:
+                        self.fetches[(kind, name)] = executor.submit(fetch, name, self.prefix)
+                    futures.append((name, self.fetches[(kind, name)]))
+            for name, future in futures:
+                value = future.result()
+                if value is None:
+                    # missing files and failed downloads are fetched again by the next call
+                    with self.lock:
+                        if self.fetches.get((kind, name)) is future:
+                            del self.fetches[(kind, name)]
+                else:
+                    # analyses add to the artifacts they get, e.g. url checks, so each gets its own copy
+                    yield name, copy.deepcopy(value)
+
+_sessions = {}
+_lock = threading.Lock()
+
+def get_session(prefix):
+    # a + chained command may read from another source, it gets a session of its own
+    key = (prefix, sys_sec_scrape.settings['incremental'], sys_sec_scrape.settings['cache_dir'], sys_sec_scrape.sources.get(prefix))
+    with _lock:
+        if key not in _sessions:
+            _sessions[key] = Session(prefix)
+        return _sessions[key]
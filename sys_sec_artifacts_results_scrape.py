@@ -1,50 +1,63 @@
-import requests
-import re
 import yaml
 import argparse
-from sys_sec_scrape import get_conferences_from_prefix, github_urls, download_file
-
-def get_ae_results(conference_regex, prefix):
-    results = {}
-    # get conference name from prefix
-    conferences = get_conferences_from_prefix(prefix)
-    if conferences is None:
-        print(f"Invalid prefix: {prefix}")
-        return results
-    # get the base url for the conference
-    for conf in conferences:
-        if re.search(conference_regex, conf['name']):
-            name = conf['name']
-            file_url = github_urls[prefix]['raw_base_url'] + name + '/results.md'
-
-            try:
-                results[name] = download_file(file_url)
-                print(f'got {name}')
-            except requests.exceptions.HTTPError as e:
-                print("couldn't get " + name)
-
-    parsed_results = {}
-
-    for year, content in results.items():
-        content = content.split('---')[1]
-        try:
-            parsed_content = yaml.safe_load(content)
-            if 'artifacts' in parsed_content:
-                parsed_results[year] = parsed_content['artifacts']
-        except yaml.YAMLError as e:
-            print(f"Error parsing TOML for year {year}: {e}")
-
-    return parsed_results
-
-def main():
+import http_client
+import metrics
+import sys_sec_scrape
+from parsing import parse_front_matter
+from session import get_session
+from sys_sec_scrape import conference_has_file, github_urls, download_file
+
+def download_results(name, prefix):
+    file_url = github_urls[prefix]['raw_base_url'] + name + '/results.md'
+    if not conference_has_file(prefix, name, 'results.md'):
+        print(f"no results for {name}")
+        return None
+    import requests
+    try:
+        content = download_file(file_url)
+        print(f'got {name}')
+        return content
+    except (requests.exceptions.HTTPError, FileNotFoundError) as e:
+        print("couldn't get " + name)
+        return None
+
+def parse_results(name, content):
+    try:
+        parsed_content = parse_front_matter(content)
+        if parsed_content and 'artifacts' in parsed_content:
+            return parsed_content['artifacts']
+    except yaml.YAMLError as e:
+        print(f"Error parsing TOML for year {name}: {e}")
+    return None
+
+def fetch_results(name, prefix):
+    content = download_results(name, prefix)
+    return None if content is None else parse_results(name, content)
+
+def iter_ae_results(conference_regex, prefix, jobs=1):
+    # yields (conference, artifacts) in listing order as soon as a conference is downloaded and parsed,
+    # conferences fetched earlier in this process are not downloaded again
+    yield from get_session(prefix).iter('results', conference_regex, fetch_results, jobs)
+
+def get_ae_results(conference_regex, prefix, jobs=1):
+    return dict(iter_ae_results(conference_regex, prefix, jobs))
+
+def main(argv=None):
 
     parser = argparse.ArgumentParser(description='Scraping results of sys/secartifacts.github.io from conferences.')
     parser.add_argument('--conf_regex', type=str, default='.20[1|2][0-9]', help='Regular expression for conference name and or years')
     parser.add_argument('--prefix', type=str, default='sys', help='Prefix of artifacts website like sys for sysartifacts or sec for secartifacts')
+    parser.add_argument('--jobs', type=int, default=1, help='Number of conferences downloaded concurrently')
 
-    args = parser.parse_args()
+    http_client.add_arguments(parser)
+    metrics.add_arguments(parser)
+    sys_sec_scrape.add_arguments(parser)
+    args = parser.parse_args(argv)
+    http_client.configure_from_args(args)
+    metrics.configure_from_args(args)
+    sys_sec_scrape.configure_from_args(args)
 
-    results = get_ae_results(args.conf_regex, args.prefix)
+    results = get_ae_results(args.conf_regex, args.prefix, args.jobs)
     for year in results.keys():
         print(f"{year}: {len(results[year])}")
         print(results[year])
@@ -1,76 +1,58 @@
-import requests
-import re
-import yaml
 import argparse
-from sys_sec_scrape import get_conferences_from_prefix, github_urls, download_file
+import http_client
+import metrics
+import sys_sec_scrape
+from parsing import parse_committee
+from session import get_session
+from sys_sec_scrape import conference_has_file, github_urls, download_file
+
+COMMITTEE_FILES = ['committee.md', 'organizers.md']
 
 def get_committee_for_conference(conference, prefix):
     base_url = github_urls[prefix]['raw_base_url'] + conference
-    # committee files are either named committee.md or organizers.md
-    try:
-        response = download_file(base_url + '/committee.md')
-    except requests.exceptions.HTTPError as e:
+    # committee files are either named committee.md or organizers.md, the
+    # conference listing tells which one exists so no request is wasted
+    import requests
+    response = None
+    for committee_file in COMMITTEE_FILES:
+        if not conference_has_file(prefix, conference, committee_file):
+            continue
         try:
-            response = download_file(base_url + '/organizers.md')
-        except requests.exceptions.HTTPError as e:
-            print(f"couldn't get committee for {conference}")
-            return None
-
-    committees_text = response.split('Artifact Evaluation Committee')
-    aec = committees_text[len(committees_text)-1].strip()
-    committee = []
-
-    for line in aec.splitlines():
-        start = 2 if line.startswith('-') or line.startswith('*') else 0
-        if '(' in line and ')' in line:
-            # eurosys 2022 and older
-            # markdown list format with -/* name (affiliation)
-            name = line[start:line.find('(')].strip()
-            affiliation = line[line.find('(')+1:line.find(')')].strip()
-        elif ',' in line:
-            # eurosys 2021
-            # comma separated format with -/* name, affiliation
-            name = line[start:].split(',')[0].strip()
-            affiliation = line.split(',')[1].strip()
-        else:
-            # unknown format
-            name = line
-            affiliation = ''
-
-        committee.append({'name': name, 'affiliation': affiliation})
+            response = download_file(base_url + '/' + committee_file)
+            break
+        except (requests.exceptions.HTTPError, FileNotFoundError) as e:
+            continue
+    if response is None:
+        print(f"couldn't get committee for {conference}")
+        return None
 
-    return committee
+    return parse_committee(response)
 
-def get_committees(conference_regex, prefix):
-    results = {}
-    # get conference name from prefix
-    conferences = get_conferences_from_prefix(prefix)
-    if conferences is None:
-        print(f"Invalid prefix: {prefix}")
-        return results
-    # get the base url for the conference
-    for conf in conferences:
-        if re.search(conference_regex, conf['name']):
-            name = conf['name']
-            if name in results:
-                continue
-            # add year
-            committee = get_committee_for_conference(name, prefix)
-            if committee:
-                results[name] = committee
+def fetch_committee(name, prefix):
+    # empty committees are left out like missing ones
+    return get_committee_for_conference(name, prefix) or None
 
-    return results
+def get_committees(conference_regex, prefix, jobs=1):
+    # committees fetched earlier in this process are not downloaded again
+    return dict(get_session(prefix).iter('committees', conference_regex, fetch_committee, jobs))
 
-def main():
+def main(argv=None):
 
     parser = argparse.ArgumentParser(description='Scraping results of sys/secartifacts.github.io from conferences.')
     parser.add_argument('--conf_regex', type=str, default='.20[1|2][0-9]', help='Regular expression for conference name and or years')
     parser.add_argument('--prefix', type=str, default='sys', help='Prefix of artifacts website like sys for sysartifacts or sec for secartifacts')
     parser.add_argument('--print', action='store_true', help='Print committees')
+    parser.add_argument('--jobs', type=int, default=1, help='Number of conferences downloaded concurrently')
 
-    args = parser.parse_args()
+    http_client.add_arguments(parser)
+    metrics.add_arguments(parser)
+    sys_sec_scrape.add_arguments(parser)
+    args = parser.parse_args(argv)
+    http_client.configure_from_args(args)
+    metrics.configure_from_args(args)
+    sys_sec_scrape.configure_from_args(args)
 
-    results = get_committees(args.conf_regex, args.prefix)
+    results = get_committees(args.conf_regex, args.prefix, args.jobs)
 
     for year in results.keys():
         print(f"{year}: {len(results[year])}")
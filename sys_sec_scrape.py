@@ -1,26 +1,260 @@
-import requests
+import hashlib
+import io
+import json
+import os
+import tarfile
+import threading
+import http_client
+import metrics
 
 github_urls= {
     'sys': {
         'base_url': "https://github.com/sysartifacts/sysartifacts.github.io/blob/master/_conferences/",
         'raw_base_url': "https://raw.githubusercontent.com/sysartifacts/sysartifacts.github.io/master/_conferences/",
-        'api_url': "https://api.github.com/repos/sysartifacts/sysartifacts.github.io/contents/_conferences/"
+        'api_url': "https://api.github.com/repos/sysartifacts/sysartifacts.github.io/contents/_conferences/",
+        'tree_url': "https://api.github.com/repos/sysartifacts/sysartifacts.github.io/git/trees/master:_conferences?recursive=1",
+        'tarball_url': "https://codeload.github.com/sysartifacts/sysartifacts.github.io/tar.gz/refs/heads/master"
     },
     'sec': {
         'base_url': "https://github.com/secartifacts/secartifacts.github.io/blob/master/_conferences/",
         'raw_base_url': "https://raw.githubusercontent.com/secartifacts/secartifacts.github.io/master/_conferences/",
-        'api_url': "https://api.github.com/repos/secartifacts/secartifacts.github.io/contents/_conferences/"
+        'api_url': "https://api.github.com/repos/secartifacts/secartifacts.github.io/contents/_conferences/",
+        'tree_url': "https://api.github.com/repos/secartifacts/secartifacts.github.io/git/trees/master:_conferences?recursive=1",
+        'tarball_url': "https://codeload.github.com/secartifacts/secartifacts.github.io/tar.gz/refs/heads/master"
     }
 }
 
+settings = {
+    'incremental': False,
+    'cache_dir': 'cache/scrape',
+}
+
+class LocalSource:
+    def __init__(self, path):
+        # either a checkout of the website or its _conferences folder
+        if os.path.basename(os.path.normpath(path)) != '_conferences':
+            path = os.path.join(path, '_conferences')
+        self.path = path
+
+    def list_conferences(self):
+        return [{'name': name, 'type': 'dir'} for name in sorted(os.listdir(self.path)) if os.path.isdir(os.path.join(self.path, name))]
+
+    def list_files(self, conference):
+        return sorted(os.listdir(os.path.join(self.path, conference)))
+
+    def read(self, path):
+        with open(os.path.join(self.path, path), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def fingerprint(self):
+        # changes whenever a conference file is added, removed or modified
+        digest = hashlib.sha256()
+        for conference in self.list_conferences():
+            for filename in self.list_files(conference['name']):
+                stat = os.stat(os.path.join(self.path, conference['name'], filename))
+                digest.update(f'{conference["name"]}/{filename}:{stat.st_size}:{stat.st_mtime_ns}\n'.encode())
+        return digest.hexdigest()
+
+class TarballSource:
+    def __init__(self, path=None, url=None):
+        # the archive is only opened or downloaded on first use
+        self.path = path
+        self.url = url
+        self.files = None
+        self.digest = None
+
+    def load(self):
+        if self.files is not None:
+            return self.files
+        if self.path is not None:
+            with open(self.path, 'rb') as f:
+                content = f.read()
+        else:
+            response = http_client.get(self.url)
+            response.raise_for_status()
+            content = response.content
+        self.digest = hashlib.sha256(content).hexdigest()
+        tar = tarfile.open(fileobj=io.BytesIO(content), mode='r:*')
+
+        self.files = {}
+        with tar:
+            for member in tar:
+                # archives have a top level folder like sysartifacts.github.io-master/
+                if not member.isfile() or '_conferences/' not in member.name:
+                    continue
+                path = member.name.split('_conferences/', 1)[1]
+                if path.count('/') == 1:
+                    self.files[path] = tar.extractfile(member).read()
+        return self.files
+
+    def list_conferences(self):
+        return [{'name': name, 'type': 'dir'} for name in sorted({path.split('/')[0] for path in self.load()})]
+
+    def list_files(self, conference):
+        return sorted(path.split('/')[1] for path in self.load() if path.startswith(conference + '/'))
+
+    def read(self, path):
+        if path not in self.load():
+            raise FileNotFoundError(path)
+        return self.load()[path].decode('utf-8')
+
+    def fingerprint(self):
+        self.load()
+        return self.digest
+
+# prefixes read from a local checkout or a tarball instead of github
+sources = {}
+
+def use_source(prefix, source):
+    if source == 'github':
+        sources.pop(prefix, None)
+    elif source == 'tarball':
+        sources[prefix] = TarballSource(url=github_urls[prefix]['tarball_url'])
+    elif os.path.isdir(source):
+        sources[prefix] = LocalSource(source)
+    else:
+        sources[prefix] = TarballSource(path=source)
+
+_trees = {}
+_blob_shas = {}
+_conference_files = {}
+_listing_lock = threading.RLock()
+_manifest_lock = threading.Lock()
+
+def get_conference_tree(prefix):
+    # blob shas of every file below _conferences/ in a single request
+    with _listing_lock:
+        if prefix not in _trees:
+            response = http_client.get(github_urls[prefix]['tree_url'])
+            response.raise_for_status()
+            data = response.json()
+            if data.get('truncated'):
+                print(f'Tree listing for {prefix} is truncated, some conferences may be missing')
+            _trees[prefix] = data
+            _blob_shas[prefix] = {item['path']: item['sha'] for item in data['tree'] if item['type'] == 'blob'}
+        return _trees[prefix]['tree']
+
+def get_conference_files(prefix):
+    # names of the files in every conference folder, None if no listing is available
+    with _listing_lock:
+        if prefix not in _conference_files:
+            if prefix in sources:
+                listing = {conf['name']: set(sources[prefix].list_files(conf['name'])) for conf in sources[prefix].list_conferences()}
+            else:
+                import requests
+                try:
+                    tree = get_conference_tree(prefix)
+                except requests.exceptions.RequestException as e:
+                    print(f'Could not list conference files for {prefix}: {e}')
+                    tree = None
+                if tree is None or _trees[prefix].get('truncated'):
+                    listing = None
+                else:
+                    listing = {}
+                    for item in tree:
+                        if item['type'] == 'blob' and item['path'].count('/') == 1:
+                            conference, filename = item['path'].split('/')
+                            listing.setdefault(conference, set()).add(filename)
+            _conference_files[prefix] = listing
+        return _conference_files[prefix]
+
+def conference_has_file(prefix, conference, filename):
+    files = get_conference_files(prefix)
+    # without a listing every file has to be requested
+    return files is None or filename in files.get(conference, ())
+
+def source_fingerprint(prefix):
+    # identifies the state of the conference files of a prefix, None if it is unknown
+    if prefix in sources:
+        return sources[prefix].fingerprint()
+    import requests
+    try:
+        get_conference_tree(prefix)
+    except requests.exceptions.RequestException as e:
+        print(f'Could not fetch the conference tree of {prefix}: {e}')
+        return None
+    return _trees[prefix]['sha']
+
+def manifest_path(prefix):
+    return os.path.join(settings['cache_dir'], prefix, 'manifest.json')
+
+def load_manifest(prefix):
+    try:
+        with open(manifest_path(prefix), 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def download_cached(prefix, path, url):
+    get_conference_tree(prefix)
+    sha = _blob_shas[prefix].get(path)
+    if sha is None:
+        # not in the tree, let the server decide
+        return download_file_uncached(url)
+
+    blob_path = os.path.join(settings['cache_dir'], prefix, 'blobs', sha)
+    if os.path.exists(blob_path):
+        metrics.increment('scrape_blob_cache_hit')
+        with open(blob_path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    content = download_file_uncached(url)
+    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+    with open(blob_path + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(blob_path + '.tmp', blob_path)
+
+    with _manifest_lock:
+        manifest = load_manifest(prefix)
+        old_sha = manifest.get(path)
+        if old_sha is not None and old_sha != sha:
+            # the file changed upstream, drop the outdated copy
+            try:
+                os.remove(os.path.join(settings['cache_dir'], prefix, 'blobs', old_sha))
+            except FileNotFoundError:
+                pass
+        manifest[path] = sha
+        with open(manifest_path(prefix) + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=4)
+        os.replace(manifest_path(prefix) + '.tmp', manifest_path(prefix))
+    return content
+
 def get_conferences_from_prefix(prefix):
+    if prefix in sources:
+        return sources[prefix].list_conferences()
+    if settings['incremental']:
+        return [{'name': item['path'], 'type': 'dir', 'sha': item['sha']} for item in get_conference_tree(prefix) if item['type'] == 'tree' and '/' not in item['path']]
     url = github_urls[prefix]['api_url']
-    response = requests.get(url)
+    response = http_client.get(url)
     response.raise_for_status()
     data = response.json()
     return [item for item in data if item['type'] == 'dir']
 
-def download_file(url):
-    response = requests.get(url)
+def download_file_uncached(url):
+    response = http_client.get(url)
     response.raise_for_status()
-    return response.text
\ No newline at end of file
+    return response.text
+
+def download_file(url):
+    for prefix, urls in github_urls.items():
+        if url.startswith(urls['raw_base_url']):
+            path = url[len(urls['raw_base_url']):]
+            if prefix in sources:
+                metrics.increment('scrape_source_read')
+                # raises FileNotFoundError for missing files
+                return sources[prefix].read(path)
+            if settings['incremental']:
+                return download_cached(prefix, path, url)
+    return download_file_uncached(url)
+
+def add_arguments(parser):
+    parser.add_argument('--incremental', action='store_true', help='List all conference files with one tree request and only download files whose blob sha changed since the last run')
+    parser.add_argument('--source', type=str, default='github', help="Where conference files are read from: 'github', 'tarball' to download the website archive once, or the path of a local checkout or tarball")
+
+def configure_from_args(args):
+    settings['incremental'] = args.incremental
+    if args.source == 'tarball':
+        for prefix in github_urls:
+            use_source(prefix, 'tarball')
+    else:
+        use_source(getattr(args, 'prefix', 'sys'), args.source)
@@ -1,23 +1,198 @@
-import requests
 import argparse
+import asyncio
 import time
+import artifact_store
+import http_client
+import metrics
+import sys_sec_scrape
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from functools import partial
+from urllib.parse import urljoin, urlparse
+from canonical_urls import canonical_key, group_by_key, normalize_url
 from sys_sec_artifacts_results_scrape import get_ae_results
 
 
-def check_url_existence(url):
+# sustained requests per second and burst size per host, hosts match on their suffix
+HOST_RATES = {
+    'zenodo.org': (1, 5),
+    'doi.org': (10, 20),
+    'github.com': (5, 10),
+    'figshare.com': (2, 5),
+}
+DEFAULT_HOST_RATE = (10, 20)
+DEFAULT_CONCURRENCY = 100
+MAX_REDIRECTS = 10
+MAX_RATE_LIMIT_RETRIES = 3
+# 429 is handled by the per host limiter instead of inside a single request
+SERVER_ERROR_STATUSES = (500, 502, 503, 504)
+# statuses that say for sure whether a url still exists, anything else may change on the next try
+GONE_STATUSES = (404, 410)
+
+async def deadline_sleep(seconds):
+    # waits for a host are given up once they would end after the global deadline
+    remaining = http_client.remaining_time()
+    if remaining is not None and seconds >= remaining:
+        from http_adapters import DeadlineExceeded
+        raise DeadlineExceeded('Global deadline for network requests exceeded while waiting for the host rate limit')
+    await asyncio.sleep(seconds)
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await deadline_sleep(self.blocked_until - now)
+                    continue
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await deadline_sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        # stop handing out tokens to every request for this host, e.g. after a 429
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+class HostRateLimiter:
+    def __init__(self, host_rates=None, default_rate=None):
+        # module defaults are read here so they can be changed at runtime, e.g. by the benchmarks
+        self.host_rates = HOST_RATES if host_rates is None else host_rates
+        self.default_rate = DEFAULT_HOST_RATE if default_rate is None else default_rate
+        self.buckets = {}
+
+    def bucket(self, host):
+        key, rate = host, self.default_rate
+        for suffix, suffix_rate in self.host_rates.items():
+            if host == suffix or host.endswith('.' + suffix):
+                key, rate = suffix, suffix_rate
+                break
+        if key not in self.buckets:
+            self.buckets[key] = TokenBucket(*rate)
+        return self.buckets[key]
+
+def retry_after(response, default=10):
+    # capped like the retries of http_client, a day long Retry-After would stall the host
+    value = response.headers.get('Retry-After')
+    if value is None:
+        return default
+    if value.isdigit():
+        return min(int(value), http_client.MAX_RETRY_AFTER)
+    try:
+        # Retry-After may also be an HTTP date
+        return min(max(0, parsedate_to_datetime(value).timestamp() - time.time()), http_client.MAX_RETRY_AFTER)
+    except (TypeError, ValueError):
+        return default
+
+async def check_url_async(url, limiter, executor):
+    import requests
+    loop = asyncio.get_running_loop()
+    report = {'url': url, 'exists': False, 'status': None, 'latency': 0.0, 'redirects': [], 'final_url': url, 'error': None}
+    start = time.monotonic()
+    current = url
+    rate_limited = 0
     try:
-        response = requests.head(url, allow_redirects=True)
-        url = ""
-        if response.status_code == 429:
-            print("Too many requests detected, sleep 10 seconds and retry")
-            # sleep and redo
-            time.sleep(10)
-            response = requests.head(url, allow_redirects=True)
-        return response.status_code == 200, url
+        while True:
+            host = urlparse(current).hostname or ''
+            bucket = limiter.bucket(host)
+            waiting = time.monotonic()
+            await bucket.acquire()
+            metrics.record_rate_limit_wait(host, time.monotonic() - waiting)
+            # redirects are followed by hand so that every hop passes its host's limiter
+            response = await loop.run_in_executor(executor, partial(http_client.head, current, allow_redirects=False, retry_statuses=SERVER_ERROR_STATUSES))
+            if response.status_code == 429 and rate_limited < MAX_RATE_LIMIT_RETRIES:
+                rate_limited += 1
+                wait = retry_after(response)
+                print(f"Too many requests for {current}, pausing host for {wait:.0f} seconds")
+                bucket.pause(wait)
+                continue
+            if response.is_redirect and len(report['redirects']) < MAX_REDIRECTS:
+                report['redirects'].append(current)
+                current = urljoin(current, response.headers['location'])
+                continue
+            report['status'] = response.status_code
+            report['exists'] = response.status_code == 200
+            if response.status_code == 429 or response.status_code >= 500:
+                # still rate limited or failing after all retries, like a network error
+                report['error'] = f'HTTP {response.status_code}'
+            break
     except requests.RequestException as e:
-        return False
+        report['error'] = str(e)
+
+    report['final_url'] = current
+    report['latency'] = time.monotonic() - start
+    return report
+
+def is_definitive(report):
+    # only these reports are stored, others are checked again by the next run
+    return report['error'] is None and report['status'] is not None and (200 <= report['status'] < 300 or report['status'] in GONE_STATUSES)
+
+async def check_urls_async(urls, concurrency=DEFAULT_CONCURRENCY, on_report=None):
+    limiter = HostRateLimiter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(url):
+        async with semaphore:
+            report = await check_url_async(url, limiter, executor)
+        if on_report is not None:
+            on_report(report)
+        return report
 
-def check_artifact_exists(results, url_keys):
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        reports = await asyncio.gather(*(run(url) for url in urls))
+    return {report['url']: report for report in reports}
+
+def check_urls(urls, concurrency=DEFAULT_CONCURRENCY, on_report=None):
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return {}
+    if http_client.settings['pool_size'] < concurrency:
+        http_client.configure(pool_size=concurrency)
+    return asyncio.run(check_urls_async(urls, concurrency, on_report))
+
+def check_url_existence(url):
+    return check_urls([url], 1)[url]['exists']
+
+def check_artifact_exists(results, url_keys, concurrency=DEFAULT_CONCURRENCY, report=None, store=None):
+    urls = []
+    for url_key in url_keys:
+        for artifacts in results.values():
+            for artifact in artifacts:
+                if url_key in artifact:
+                    # exception since, some urls are just the doi
+                    artifact[url_key] = normalize_url(artifact[url_key])
+                    urls.append(artifact[url_key])
+
+    # every repository or record is checked once, no matter how many urls point to it
+    representatives = group_by_key(urls)
+    key_reports = {}
+    on_report = None
+    if store is not None:
+        # resume from the checks of earlier runs that did not expire yet
+        for key, url in representatives.items():
+            stored = store.get_check(key)
+            if stored is not None:
+                key_reports[url] = stored
+        # network errors, rate limits and server errors are not stored so that the next run retries them
+        on_report = lambda url_report: store.put_check(canonical_key(url_report['url']), url_report['url'], url_report) if is_definitive(url_report) else None
+
+    pending = [url for url in representatives.values() if url not in key_reports]
+    print(f'testing {len(pending)} unique artifacts for {len(urls)} urls in {", ".join(url_keys)}, {len(key_reports)} already checked')
+    key_reports.update(check_urls(pending, concurrency, on_report))
+    url_reports = {url: key_reports[representatives[canonical_key(url)]] for url in urls}
+    if report is not None:
+        report.update(url_reports)
 
     counts = {}
     failed = []
@@ -27,14 +202,9 @@ def check_artifact_exists(results, url_keys):
             counts[url_key][name] = {}
             counts[url_key][name]['exists'] = 0
             counts[url_key][name]['total'] = 0
-            print(f'testing {len(artifacts)} artifacts urls for {url_key}')
             for artifact in artifacts:
                 if url_key in artifact:
-                    # exception since, some urls are just the doi
-                    if artifact[url_key].startswith('10.'):
-                        artifact[url_key] = 'https://doi.org/' + artifact[url_key]
-
-                    exists = check_url_existence(artifact[url_key])
+                    exists = url_reports[artifact[url_key]]['exists']
                     if exists:
                         counts[url_key][name]['exists'] = counts[url_key][name]['exists'] + 1
                         counts[url_key][name]['total'] = counts[url_key][name]['total'] + 1
@@ -49,18 +219,30 @@ def check_artifact_exists(results, url_keys):
 
     return results, counts, failed
 
-def main():
+def main(argv=None):
 
     parser = argparse.ArgumentParser(description='Scraping results of sys/secartifacts.github.io from conferences.')
     parser.add_argument('--conf_regex', type=str, default='.20[1|2][0-9]', help='Regular expression for conference name and or names')
     parser.add_argument('--prefix', type=str, default='sys', help='Prefix of artifacts website like sys for sysartifacts or sec for secartifacts')
+    parser.add_argument('--jobs', type=int, default=1, help='Number of conferences downloaded concurrently')
     parser.add_argument('--print_failed', action='store_true', help='Print failed website checks')
     parser.add_argument('--url_keys', type=str, nargs='+', default=['repository_url'], help='Keys in the artifact dictionary to check the URLs for')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help='Number of URL checks running at once')
+    parser.add_argument('--print_report', action='store_true', help='Print status, latency and redirect chain of every checked URL')
 
-    args = parser.parse_args()
-    results = get_ae_results(args.conf_regex, args.prefix)
+    http_client.add_arguments(parser)
+    metrics.add_arguments(parser)
+    sys_sec_scrape.add_arguments(parser)
+    artifact_store.add_arguments(parser)
+    args = parser.parse_args(argv)
+    http_client.configure_from_args(args)
+    metrics.configure_from_args(args)
+    sys_sec_scrape.configure_from_args(args)
+    store = artifact_store.open_from_args(args)
+    results = get_ae_results(args.conf_regex, args.prefix, args.jobs)
 
-    _, counts, failed = check_artifact_exists(results, args.url_keys)
+    report = {}
+    _, counts, failed = check_artifact_exists(results, args.url_keys, args.concurrency, report, store)
 
     print("url_key, name, total, exists, failed, percentage")
     for url_key, key_counts in counts.items():
@@ -68,6 +250,12 @@ def main():
             percentage = (count['exists'] / count['total']) * 100 if count['total'] > 0 else 0
             print(f"{url_key}, {name}, {count['total']}, {count['exists']}, {count['total'] - count['exists']}, {percentage:.2f}%")
 
+    if args.print_report:
+        print("url, status, latency, redirects")
+        for url, url_report in report.items():
+            status = url_report['status'] if url_report['error'] is None else url_report['error']
+            print(f"{url}, {status}, {url_report['latency']:.2f}s, {' -> '.join(url_report['redirects'] + [url_report['final_url']])}")
+
     if(args.print_failed):
         print("Failed:")
         for f in failed:
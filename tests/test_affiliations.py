@@ -0,0 +1,52 @@
+import pytest
+from affiliations import normalize, resolve_affiliations, same_institution
+
+DIFFERENT = [
+    ('University of Hong Kong', 'Hong Kong University of Science and Technology'),
+    ('University of Vienna', 'Vienna University of Technology'),
+    ('University of Graz', 'Graz University of Technology'),
+    ('Zhejiang University', 'Zhejiang University of Technology'),
+    ('University of California', 'California Institute of Technology'),
+]
+
+SAME = [
+    ('Google', 'Google Research'),
+    ('Stanford', 'Stanford University'),
+    ('University of Toronto', 'Toronto University'),
+    ('ETH Zürich', 'ETH Zurich'),
+]
+
+@pytest.mark.parametrize('name, other', DIFFERENT)
+def test_same_place_different_institutions(name, other):
+    assert not same_institution(normalize(name), normalize(other))
+    institutions = resolve_affiliations([name, other], learned_path=None)
+    assert institutions[name] != institutions[other]
+
+@pytest.mark.parametrize('name, other', SAME)
+def test_spellings_of_one_institution(name, other):
+    institutions = resolve_affiliations([name, other], learned_path=None)
+    assert institutions[name] == institutions[other]
+
+@pytest.mark.parametrize('acronym, institution, other', [
+    ('NTU', 'Nanyang Technological University', 'National Taiwan University'),
+    ('MIT', 'Massachusetts Institute of Technology', 'Manipal Institute of Technology'),
+    ('CMU', 'Carnegie Mellon University', 'Central Michigan University'),
+])
+def test_curated_acronyms(acronym, institution, other):
+    institutions = resolve_affiliations([acronym, institution, other], learned_path=None)
+    assert institutions[acronym] == institution
+    assert institutions[institution] == institution
+    assert institutions[other] == other
+
+def test_uiuc_spellings():
+    spellings = ['UIUC', 'University of Illinois at Urbana-Champaign', 'University of Illinois Urbana-Champaign', 'Univ. of Illinois Urbana Champaign']
+    institutions = resolve_affiliations(spellings + ['University of Illinois Chicago'], learned_path=None)
+    assert {institutions[spelling] for spelling in spellings} == {'University of Illinois Urbana-Champaign'}
+    assert institutions['University of Illinois Chicago'] == 'University of Illinois Chicago'
+
+def test_learned_aliases_keep_places_apart(tmp_path):
+    path = str(tmp_path / 'aliases.json')
+    resolve_affiliations([name for pair in DIFFERENT for name in pair], learned_path=path)
+    institutions = resolve_affiliations([name for pair in DIFFERENT for name in pair], learned_path=path)
+    for name, other in DIFFERENT:
+        assert institutions[name] != institutions[other]
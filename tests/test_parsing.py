@@ -0,0 +1,95 @@
+import os
+import sys
+import pytest
+import yaml
+from parsing import parse_committee, parse_front_matter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from corpus import Corpus
+
+def old_front_matter(content):
+    # results.md parser before parsing.py
+    return yaml.safe_load(content.split('---')[1])
+
+def old_committee(content):
+    # committee parser before parsing.py, it kept blank lines as members without a name
+    committees_text = content.split('Artifact Evaluation Committee')
+    aec = committees_text[len(committees_text)-1].strip()
+    committee = []
+    for line in aec.splitlines():
+        start = 2 if line.startswith('-') or line.startswith('*') else 0
+        if '(' in line and ')' in line:
+            name = line[start:line.find('(')].strip()
+            affiliation = line[line.find('(')+1:line.find(')')].strip()
+        elif ',' in line:
+            name = line[start:].split(',')[0].strip()
+            affiliation = line.split(',')[1].strip()
+        else:
+            name = line
+            affiliation = ''
+        committee.append({'name': name, 'affiliation': affiliation})
+    return [member for member in committee if member['name']]
+
+def committee_page(*lines):
+    return '\n'.join(['---', 'title: Committee', '---', '', '## Artifact Evaluation Committee', ''] + list(lines)) + '\n'
+
+@pytest.mark.parametrize('lines, expected', [
+    (['- Jane Doe (ETH Zurich)', '* John Roe (MIT)'], [('Jane Doe', 'ETH Zurich'), ('John Roe', 'MIT')]),
+    (['- Jane Doe, ETH Zurich', '- John Roe, University of Illinois, Urbana-Champaign'], [('Jane Doe', 'ETH Zurich'), ('John Roe', 'University of Illinois')]),
+    (['Jane Doe', 'John Roe'], [('Jane Doe', ''), ('John Roe', '')]),
+    (['- Jane Doe (ETH Zurich)', '', '- John Roe, MIT', '', 'Alice Smith'], [('Jane Doe', 'ETH Zurich'), ('John Roe', 'MIT'), ('Alice Smith', '')]),
+])
+def test_committee_lists_like_old_parser(lines, expected):
+    content = committee_page(*lines)
+    committee = parse_committee(content)
+    assert committee == old_committee(content)
+    assert [(member['name'], member['affiliation']) for member in committee] == expected
+
+def test_markdown_table():
+    content = committee_page('| Name | Affiliation |', '|------|:-----------:|', '| Jane Doe | ETH Zurich |', '| John Roe | MIT |', '| Alice Smith |')
+    assert parse_committee(content) == [
+        {'name': 'Jane Doe', 'affiliation': 'ETH Zurich'},
+        {'name': 'John Roe', 'affiliation': 'MIT'},
+        {'name': 'Alice Smith', 'affiliation': ''},
+    ]
+
+def test_html_table():
+    content = committee_page(
+        '<table>',
+        '<tr><th>Name</th><th>Affiliation</th></tr>',
+        '<tr><td><b>Jane Doe</b></td><td>ETH Z&uuml;rich</td></tr>',
+        '<tr>',
+        '  <td>John Roe</td>',
+        '  <td>MIT</td>',
+        '</tr>',
+        '</table>',
+    )
+    assert parse_committee(content) == [
+        {'name': 'Jane Doe', 'affiliation': 'ETH Zürich'},
+        {'name': 'John Roe', 'affiliation': 'MIT'},
+    ]
+
+def test_html_list():
+    content = committee_page('<ul>', '<li>Jane Doe (ETH Zurich)</li>', '<li>John Roe, MIT</li>', '</ul>')
+    assert parse_committee(content) == [
+        {'name': 'Jane Doe', 'affiliation': 'ETH Zurich'},
+        {'name': 'John Roe', 'affiliation': 'MIT'},
+    ]
+
+def test_front_matter_like_old_parser():
+    content = '---\ntitle: Results\nartifacts:\n  - title: "Fast"\n    badges: "available,functional"\n---\n\nBody text\n'
+    assert parse_front_matter(content) == old_front_matter(content)
+
+def test_front_matter_with_dashes_in_a_value():
+    # the old split ended the front matter at the first --- anywhere, also inside a title
+    content = '---\ntitle: Results\nartifacts:\n  - title: Fast --- and safe\n    badges: available\n---\n\nBody --- text\n'
+    assert parse_front_matter(content) == {'title': 'Results', 'artifacts': [{'title': 'Fast --- and safe', 'badges': 'available'}]}
+    assert old_front_matter(content) == {'title': 'Results', 'artifacts': [{'title': 'Fast'}]}
+
+def test_synthetic_corpus_like_old_parser():
+    corpus = Corpus(1, 0)
+    for conference in list(corpus.conferences)[:10]:
+        results = corpus.results_md(conference)
+        assert parse_front_matter(results) == old_front_matter(results)
+        committee = corpus.committee_md(conference)
+        assert parse_committee(committee) == old_committee(committee)
@@ -0,0 +1,137 @@
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import pickle
+import time
+import numpy as np
+import http_client
+import metrics
+from fuzzy_index import FuzzyIndex
+
+UNIVERSITY_LIST_URL = "https://raw.githubusercontent.com/Hipo/university-domains-list/master/world_universities_and_domains.json"
+ALIASES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'university_aliases.json')
+INDEX_PATH = 'cache/university_index.pickle'
+# bump when the layout of UniversityIndex changes
+INDEX_VERSION = 1
+CHECK_INTERVAL_HOURS = 24
+
+def build_name_index(university_info):
+    name_index = {}
+    for uni in university_info:
+        name_index[uni['name'].lower()] = uni
+        splitted = uni['name'].split(" ")
+        if len(splitted) > 1:
+            for splitted_name in splitted:
+                name_index[splitted_name.lower()] = uni
+            if len(splitted) > 2:
+                for s_cnt in range(1, len(splitted)-1):
+                    name_index[" ".join(splitted[s_cnt:]).lower()] = uni
+    return name_index
+
+class UniversityIndex:
+    def __init__(self, university_info):
+        name_index = build_name_index(university_info)
+        # names keep the insertion order of name_index, their position is the name id
+        self.names = list(name_index.keys())
+        self.countries = [uni['country'] for uni in name_index.values()]
+        self.name_ids = {name: i for i, name in enumerate(self.names)}
+        self.sorted_ids = np.array(sorted(range(len(self.names)), key=self.names.__getitem__), dtype=np.int32)
+        self.sorted_names = [self.names[i] for i in self.sorted_ids]
+        self.fuzzy_index = FuzzyIndex(self.names)
+
+    def prefix_match(self, prefix):
+        # same result as pytrie.Trie(**name_index).values(prefix=prefix)[0]: follow the
+        # earliest inserted key with this prefix and return the first key on its path
+        lo = bisect.bisect_left(self.sorted_names, prefix)
+        hi = bisect.bisect_left(self.sorted_names, prefix + '\U0010ffff', lo)
+        if lo == hi:
+            return None
+        first = self.names[self.sorted_ids[lo:hi].min()]
+        for end in range(len(prefix), len(first) + 1):
+            if first[:end] in self.name_ids:
+                return self.countries[self.name_ids[first[:end]]]
+
+    def fuzzy_match(self, affiliation, threshold=80):
+        name, ratio = self.fuzzy_index.best_match(affiliation, threshold)
+        return (self.countries[self.name_ids[name]] if name is not None else None), ratio
+
+def file_hash(content):
+    return hashlib.sha256(content).hexdigest()
+
+def save_index(path, stamp, index):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'wb') as f:
+        pickle.dump((stamp, index), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + '.tmp', path)
+
+def load_university_index(path=INDEX_PATH, check_interval_hours=CHECK_INTERVAL_HOURS, force=False):
+    with open(ALIASES_PATH, 'rb') as f:
+        aliases_content = f.read()
+    aliases_hash = file_hash(aliases_content)
+
+    stamp, index = None, None
+    if not force and os.path.exists(path):
+        with open(path, 'rb') as f:
+            stamp, index = pickle.load(f)
+        if stamp['version'] != INDEX_VERSION or stamp['aliases_hash'] != aliases_hash:
+            stamp, index = None, None
+
+    if index is not None:
+        if time.time() - stamp['checked_at'] < check_interval_hours * 3600:
+            return index
+        # ask upstream whether the university list changed since the index was built
+        import requests
+        try:
+            response = http_client.get(UNIVERSITY_LIST_URL, headers={'If-None-Match': stamp['etag']} if stamp['etag'] else {})
+        except requests.RequestException as e:
+            response = None
+            print(f'Could not check the university list, using the cached index: {e}')
+        if response is not None and response.status_code not in (200, 304):
+            print(f'Could not check the university list (HTTP {response.status_code}), using the cached index')
+            response = None
+        if response is None:
+            # checked again by the next run
+            return index
+        if response.status_code == 304 or (response.status_code == 200 and file_hash(response.content) == stamp['source_hash']):
+            stamp['checked_at'] = time.time()
+            stamp['etag'] = response.headers.get('ETag', stamp['etag'])
+            save_index(path, stamp, index)
+            return index
+    else:
+        response = http_client.get(UNIVERSITY_LIST_URL)
+    response.raise_for_status()
+
+    print('Building university index')
+    university_info = json.loads(response.content)
+    university_info.extend(json.loads(aliases_content))
+    index = UniversityIndex(university_info)
+    stamp = {
+        'version': INDEX_VERSION,
+        'source_hash': file_hash(response.content),
+        'aliases_hash': aliases_hash,
+        'etag': response.headers.get('ETag'),
+        'checked_at': time.time(),
+    }
+    save_index(path, stamp, index)
+    return index
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the university name index used to map AEC affiliations to countries.')
+    parser.add_argument('--index', type=str, default=INDEX_PATH, help='Path of the index file')
+    parser.add_argument('--force', action='store_true', help='Rebuild the index even if the university list and aliases did not change')
+
+    http_client.add_arguments(parser)
+    metrics.add_arguments(parser)
+    args = parser.parse_args(argv)
+    http_client.configure_from_args(args)
+    metrics.configure_from_args(args)
+
+    start = time.monotonic()
+    index = load_university_index(args.index, check_interval_hours=0, force=args.force)
+    print(f'{len(index.names)} names in {args.index}, took {time.monotonic() - start:.2f}s')
+
+if __name__ == "__main__":
+    main()